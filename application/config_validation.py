@@ -0,0 +1,65 @@
+# application/config_validation.py
+from __future__ import annotations
+from application.scheduler import parse_schedule
+
+REQUIRED_KEYS = ("source_table", "target_table", "primary_key")
+
+
+def validate_table_config(table_config: dict) -> list[str]:
+    """
+    Revisa TABLE_CONFIG sin tocar ninguna BD. Devuelve la lista de errores
+    (vacía si todo es correcto).
+    """
+    errors: list[str] = []
+    targets: dict[str, str] = {}
+    for key, cfg in table_config.items():
+        for req in REQUIRED_KEYS:
+            if not cfg.get(req):
+                errors.append(f"{key}: falta '{req}'")
+        dst = cfg.get("target_table")
+        if dst in targets:
+            errors.append(f"{key}: target_table '{dst}' repetida (también en {targets[dst]})")
+        elif dst:
+            targets[dst] = key
+        if not isinstance(cfg.get("date_columns", []), list):
+            errors.append(f"{key}: 'date_columns' debe ser una lista")
+        if not all(isinstance(v, int) for v in cfg.get("date_sentinels") or []):
+            errors.append(f"{key}: 'date_sentinels' debe ser una lista de enteros YYYYMMDD")
+        if not isinstance(cfg.get("rename_columns") or {}, dict):
+            errors.append(f"{key}: 'rename_columns' debe ser un dict")
+        for opt in ("include_columns", "exclude_columns"):
+            if not isinstance(cfg.get(opt) or [], list):
+                errors.append(f"{key}: '{opt}' debe ser una lista")
+        if cfg.get("primary_key") in (cfg.get("exclude_columns") or []):
+            errors.append(f"{key}: la PK no puede estar en 'exclude_columns'")
+        if not isinstance(cfg.get("source_filter") or "", str):
+            errors.append(f"{key}: 'source_filter' debe ser un texto SQL")
+        part = cfg.get("partitioning")
+        if part is not None:
+            if not isinstance(part, dict) or part.get("method", "range") not in ("range", "hash"):
+                errors.append(f"{key}: 'partitioning' debe ser un dict con method range|hash")
+            elif part.get("method") == "hash" and part.get("column", cfg.get("primary_key")) \
+                    != cfg.get("primary_key"):
+                errors.append(f"{key}: el particionado hash solo se admite por PK")
+        maint = cfg.get("maintenance") or {}
+        unknown = set(maint) - {"fillfactor", "analyze_fraction", "covering_index"}
+        if unknown:
+            errors.append(f"{key}: claves de 'maintenance' desconocidas: {sorted(unknown)}")
+        if not 10 <= maint.get("fillfactor", 100) <= 100:
+            errors.append(f"{key}: 'fillfactor' debe estar entre 10 y 100")
+        if maint.get("covering_index") is False and (cfg.get("partitioning") or {}).get("column") \
+                not in (None, cfg.get("primary_key")):
+            errors.append(f"{key}: 'covering_index' es el índice por PK de las tablas "
+                          f"particionadas por fecha; no se puede desactivar")
+        mode = (cfg.get("data_cleaning") or {}).get("handle_invalid_foreign_keys")
+        if mode not in (None, "add_placeholder", "set_null"):
+            errors.append(f"{key}: handle_invalid_foreign_keys '{mode}' desconocido")
+        for fk in cfg.get("foreign_keys") or []:
+            if not all(fk.get(f) for f in ("column", "ref_table", "ref_column")):
+                errors.append(f"{key}: foreign_keys requiere column/ref_table/ref_column")
+        if cfg.get("schedule"):
+            try:
+                parse_schedule(cfg["schedule"])
+            except ValueError as exc:
+                errors.append(f"{key}: schedule inválido ({exc})")
+    return errors
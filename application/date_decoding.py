@@ -0,0 +1,141 @@
+# application/date_decoding.py
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Valores que Sigrid guarda en lugar de NULL en sus columnas YYYYMMDD
+SIGRID_DATE_SENTINELS: tuple[int, ...] = (0, 99991231, 99999999)
+
+# Rango representable por datetime64[ns] (años completos)
+_MIN_YEAR, _MAX_YEAR = 1678, 2261
+_NS_PER_DAY = 86_400 * 10**9
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+
+
+# ───── Aritmética de fechas ────────────────────────────────────────────────
+def _days_from_civil(y: np.ndarray, m: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """Días desde 1970-01-01 para fechas gregorianas (algoritmo de H. Hinnant)."""
+    y = y - (m <= 2)
+    era = np.floor_divide(y, 400)
+    yoe = y - era * 400
+    mp = (m + 9) % 12
+    doy = (153 * mp + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146_097 + doe - 719_468
+
+
+def decode_yyyymmdd(
+    values: np.ndarray,
+    sentinels: Iterable[int] = SIGRID_DATE_SENTINELS,
+) -> np.ndarray:
+    """
+    Decodifica enteros YYYYMMDD (cualquier forma; NaN = NULL) a datetime64[ns]
+    sólo con aritmética entera. Centinelas, fechas imposibles (20230230) y
+    valores fuera de rango quedan como NaT, igual que ``errors="coerce"``.
+    """
+    raw = np.asarray(values, dtype=np.float64)
+    valid = np.isfinite(raw) & (raw == np.floor(raw))
+    v = np.where(valid, raw, 0).astype(np.int64)
+
+    y, md = np.divmod(v, 10_000)
+    m, d = np.divmod(md, 100)
+    valid &= (y >= _MIN_YEAR) & (y <= _MAX_YEAR) & (m >= 1) & (m <= 12) & (d >= 1)
+
+    m_safe = np.where(valid, m, 1)
+    leap = (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+    valid &= d <= _DAYS_IN_MONTH[m_safe] + ((m_safe == 2) & leap)
+    sentinels = np.asarray(list(sentinels), dtype=np.int64)
+    if sentinels.size:
+        valid &= ~np.isin(v, sentinels)
+
+    days = _days_from_civil(np.where(valid, y, 1970), m_safe, np.where(valid, d, 1))
+    out = (days * _NS_PER_DAY).view("datetime64[ns]")
+    out[~valid] = np.datetime64("NaT")
+    return out
+
+
+# ───── Columnas de un DataFrame ────────────────────────────────────────────
+def _as_number(values) -> np.ndarray:
+    """Texto '20240131 ' / bytes / Decimal / None → float64 (NaN si no es numérico)."""
+    values = [v.decode("ascii", "replace") if isinstance(v, bytes) else v for v in values]
+    s = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+    return s.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _decode_objects(values: np.ndarray, sentinels: tuple[int, ...]) -> np.ndarray:
+    """
+    Valores de una columna object → datetime64[ns]. pyodbc devuelve las
+    columnas date/datetime2 como `datetime.date`/`datetime`: esos pasan por
+    `pd.to_datetime`; el texto/bytes/Decimal se decodifica como YYYYMMDD.
+    """
+    values = np.asarray(values, dtype=object)
+    is_date = np.fromiter((isinstance(v, (date, np.datetime64)) for v in values),
+                          dtype=bool, count=len(values))
+    if not is_date.any():
+        return decode_yyyymmdd(_as_number(values), sentinels)
+    out = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    if not is_date.all():
+        out[~is_date] = decode_yyyymmdd(_as_number(values[~is_date]), sentinels)
+    # utc=True admite naive y con zona mezclados; los naive no se desplazan
+    parsed = pd.to_datetime(pd.Series(values[is_date], dtype=object),
+                            errors="coerce", utc=True).dt.tz_convert(None)
+    parsed = parsed.to_numpy()
+    # fuera del rango de datetime64[ns] (date(1, 1, 1)…) → NaT, no desborde
+    in_range = ((parsed >= np.datetime64(f"{_MIN_YEAR}-01-01"))
+                & (parsed < np.datetime64(f"{_MAX_YEAR + 1}-01-01")))
+    out[is_date] = np.where(in_range, parsed, np.datetime64("NaT")).astype("datetime64[ns]")
+    return out
+
+
+def decode_date_columns(
+    df: pd.DataFrame,
+    columns: Sequence[str],
+    *,
+    sentinels: Iterable[int] = SIGRID_DATE_SENTINELS,
+    memoize: bool = True,
+) -> pd.DataFrame:
+    """
+    Convierte ``columns`` de ``df`` (in situ) a datetime64[ns] en una sola
+    pasada: las columnas numéricas se apilan y se decodifican juntas; las de
+    texto/objeto se factorizan y sólo se interpretan sus valores únicos
+    (``memoize``), que en Sigrid son pocos comparados con el nº de filas.
+    Las columnas que ya vienen como datetime se dejan tal cual, y los
+    valores date/datetime dentro de columnas object se conservan.
+    """
+    sentinels = tuple(sentinels)
+    numeric, textual = [], []
+    for col in columns:
+        dtype = df[col].dtype
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            continue
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            numeric.append(col)
+        else:
+            textual.append(col)
+
+    if numeric:
+        block = df[numeric].to_numpy(dtype=np.float64, na_value=np.nan)
+        decoded = decode_yyyymmdd(block, sentinels)
+        for i, col in enumerate(numeric):
+            df[col] = pd.Series(decoded[:, i], index=df.index)
+
+    if textual and memoize:
+        codes, uniques = [], []
+        for col in textual:
+            c, u = pd.factorize(df[col], use_na_sentinel=True)
+            codes.append(c)
+            uniques.append(np.asarray(u, dtype=object))
+        offsets = np.cumsum([0] + [len(u) for u in uniques])
+        table = _decode_objects(np.concatenate(uniques), sentinels)
+        table = np.append(table, np.datetime64("NaT", "ns"))        # destino de NULL
+        for col, c, off in zip(textual, codes, offsets):
+            idx = np.where(c >= 0, c + off, len(table) - 1)
+            df[col] = pd.Series(table[idx], index=df.index)
+    elif textual:
+        for col in textual:
+            df[col] = pd.Series(_decode_objects(df[col].to_numpy(), sentinels), index=df.index)
+    return df
@@ -0,0 +1,41 @@
+# application/diff.py
+from __future__ import annotations
+import numpy as np, pandas as pd
+from application.keyset import KeySet
+
+
+class HashDiff:
+    """
+    Resultado de comparar hashes origen/destino por PK (como KeySet).
+    """
+    def __init__(self, new_ids, changed_ids, deleted_ids) -> None:
+        self.new_ids = new_ids
+        self.changed_ids = changed_ids
+        self.deleted_ids = deleted_ids
+
+    @property
+    def to_load(self) -> KeySet:
+        return self.new_ids.union(self.changed_ids)
+
+    def __len__(self) -> int:
+        return len(self.new_ids) + len(self.changed_ids)
+
+
+def diff_hashes(hash_src: pd.DataFrame, hash_dst: pd.DataFrame, pk: str) -> HashDiff:
+    """
+    Diff vectorizado sobre arrays NumPy (sin merge ni listas de ints).
+    Los hashes se comparan como float64 (CHECKSUM cabe exacto) para que un
+    hash NULL en destino cuente como modificado.
+    """
+    src_ids = hash_src[pk].to_numpy(dtype=np.int64)
+    dst_ids = hash_dst[pk].to_numpy(dtype=np.int64)
+    src_h = hash_src["hash_crc32"].to_numpy(dtype=np.float64, na_value=np.nan)
+    dst_h = hash_dst["hash_crc32"].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    common, i_src, i_dst = np.intersect1d(src_ids, dst_ids, return_indices=True)
+    changed = common[src_h[i_src] != dst_h[i_dst]]
+    return HashDiff(
+        KeySet(np.setdiff1d(src_ids, common)),
+        KeySet(changed, _sorted=True),
+        KeySet(np.setdiff1d(dst_ids, common)),
+    )
@@ -0,0 +1,164 @@
+# application/extraction_planner.py
+"""
+Planificador de extracciones.
+
+Agrupa configs por (source_table, primary_key, source_filter): cada grupo
+se escanea y se lee una sola vez y cada lote se reparte entre sus ramas.
+
+Proyección (`include_columns` / `exclude_columns`): el grupo lee la unión
+de las columnas de *todas* las configs de TABLE_CONFIG con el mismo origen
+y filtro, no solo de las seleccionadas en el run. Así el CHECKSUM (que se
+calcula sobre esas columnas y se guarda como hash_crc32) no depende de qué
+tablas se lancen juntas. Cambiar la proyección cambia los hashes y provoca
+una recarga completa de esa tabla la siguiente vez.
+"""
+from __future__ import annotations
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionGroup:
+    """
+    Configs que comparten tabla origen, PK y filtro. `keys` son las ramas
+    a cargar; `siblings` todas las configs equivalentes (para proyectar).
+    """
+    def __init__(
+        self,
+        source_table: str,
+        primary_key: str,
+        source_filter: str | None,
+        keys: list[str],
+        siblings: list[str],
+    ) -> None:
+        self.source_table = source_table
+        self.primary_key = primary_key
+        self.source_filter = source_filter
+        self.keys = keys
+        self.siblings = siblings
+
+    def __repr__(self) -> str:
+        return f"ExtractionGroup({self.source_table!r}, {self.keys!r})"
+
+
+def _group_key(cfg: dict) -> tuple:
+    return (cfg["source_table"], cfg["primary_key"], cfg.get("source_filter") or None)
+
+
+def plan_extraction(tables: list[str], table_config: dict) -> list[ExtractionGroup]:
+    """
+    Agrupa las tablas seleccionadas respetando el orden de la primera
+    aparición.
+    """
+    groups: dict[tuple, ExtractionGroup] = {}
+    for key in tables:
+        cfg = table_config.get(key)
+        if not cfg:
+            logger.warning("No config para %s – omitida.", key)
+            continue
+        gkey = _group_key(cfg)
+        if gkey in groups:
+            groups[gkey].keys.append(key)
+            continue
+        siblings = [k for k, c in table_config.items() if _group_key(c) == gkey]
+        groups[gkey] = ExtractionGroup(*gkey, keys=[key], siblings=siblings)
+    for group in groups.values():
+        if len(group.keys) > 1:
+            logger.info("🔀 Origen %s compartido por %s: una sola lectura.",
+                        group.source_table, group.keys)
+    return _order_by_foreign_keys(list(groups.values()), table_config)
+
+
+def _order_by_foreign_keys(groups: list[ExtractionGroup], table_config: dict) -> list:
+    """
+    Orden topológico estable: un grupo que carga una tabla referenciada por
+    `foreign_keys` de otro va antes, para validar FKs contra datos frescos.
+    Los ciclos se ignoran (se mantiene el orden original).
+    """
+    by_target = {
+        table_config[k]["target_table"]: g for g in groups for k in g.keys
+    }
+    ordered, done, visiting = [], set(), set()
+
+    def visit(group):
+        if id(group) in done or id(group) in visiting:
+            return
+        visiting.add(id(group))
+        for dep in _dependencies(group, by_target, table_config):
+            visit(dep)
+        visiting.discard(id(group))
+        done.add(id(group))
+        ordered.append(group)
+
+    for group in groups:
+        visit(group)
+    return ordered
+
+
+def _dependencies(group: ExtractionGroup, by_target: dict, table_config: dict) -> list:
+    deps = []
+    for key in group.keys:
+        for fk in table_config[key].get("foreign_keys") or []:
+            dep = by_target.get(fk.get("ref_table"))
+            if dep is not None and dep is not group:
+                deps.append(dep)
+    return deps
+
+
+def fk_waves(groups: list[ExtractionGroup], table_config: dict) -> list[list[ExtractionGroup]]:
+    """
+    Oleadas para ejecutar en paralelo: cada grupo va en una oleada posterior
+    a la de los grupos que cargan sus tablas referenciadas; dentro de una
+    oleada no hay dependencias. Los ciclos se ignoran, como en el orden
+    topológico. `groups` debe venir ya ordenado (`plan_extraction`).
+    """
+    by_target = {
+        table_config[k]["target_table"]: g for g in groups for k in g.keys
+    }
+    level: dict[int, int] = {}
+    waves: list[list[ExtractionGroup]] = []
+    for group in groups:
+        # en orden topológico las dependencias (salvo ciclos) ya tienen nivel
+        deps = [level[id(d)] for d in _dependencies(group, by_target, table_config)
+                if id(d) in level]
+        lvl = max(deps) + 1 if deps else 0
+        level[id(group)] = lvl
+        if lvl == len(waves):
+            waves.append([])
+        waves[lvl].append(group)
+    return waves
+
+
+# --------------------------------------------------------------------------- #
+def _projects(cfg: dict) -> bool:
+    return bool(cfg.get("include_columns") or cfg.get("exclude_columns"))
+
+
+def branch_columns(cfg: dict, all_columns: list[str]) -> list[str]:
+    """
+    Columnas que necesita una config, en orden de origen (PK siempre).
+    """
+    include = cfg.get("include_columns")
+    exclude = set(cfg.get("exclude_columns") or ())
+    wanted = set(include) if include else set(all_columns)
+    wanted.add(cfg["primary_key"])
+    return [c for c in all_columns if c in wanted and (c not in exclude
+                                                       or c == cfg["primary_key"])]
+
+
+def needs_projection(group: ExtractionGroup, table_config: dict) -> bool:
+    return any(_projects(table_config[k]) for k in group.siblings)
+
+
+def group_columns(group: ExtractionGroup, table_config: dict,
+                  all_columns: list[str]) -> list[str] | None:
+    """
+    Columnas a leer para el grupo, o None si ninguna config proyecta
+    (→ `SELECT *` / `CHECKSUM(*)`, igual que antes).
+    """
+    if not needs_projection(group, table_config):
+        return None
+    wanted: set[str] = set()
+    for key in group.siblings:
+        wanted.update(branch_columns(table_config[key], all_columns))
+    return [c for c in all_columns if c in wanted]
@@ -0,0 +1,160 @@
+# application/fk_validation.py
+"""
+Validación vectorizada de claves foráneas contra las tablas destino.
+
+Para cada `foreign_keys` de la config se carga una vez (y se cachea) el
+conjunto de claves de la tabla referenciada como KeySet (int64 ordenado);
+cada chunk se comprueba con searchsorted, sin consultas por fila.
+
+`data_cleaning.handle_invalid_foreign_keys`:
+
+- 'add_placeholder': las claves inválidas se sustituyen por la clave
+  placeholder (`data_cleaning.placeholder_key`, -1 por defecto), cuya fila
+  se inserta una sola vez en la tabla referenciada.
+- 'set_null':        las claves inválidas pasan a NULL.
+- sin valor:         no se valida.
+
+Las filas corregidas se guardan con su hash real y quedan anotadas en
+`pending` (PgFkPending) con la clave que faltaba. Al cargar de nuevo la
+tabla referenciada se comprueban solo esas anotaciones: las que ya tienen
+su clave se marcan para recarga y, como las tablas referenciadas cargan
+antes, la FK original se recupera en ese mismo run.
+"""
+from __future__ import annotations
+import logging, threading, numpy as np, pandas as pd
+from application.keyset import KeySet
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_KEY = -1
+MODES = ("add_placeholder", "set_null")
+
+
+class ForeignKeyValidator:
+    """
+    `key_loader(table, column)` → array de claves o None si la tabla no
+    existe; `placeholder_writer(table, column, key)` inserta el placeholder;
+    `pending` (opcional) anota las FKs colgantes para revisarlas después.
+    """
+    def __init__(self, key_loader, placeholder_writer, pending=None) -> None:
+        self.key_loader = key_loader
+        self.placeholder_writer = placeholder_writer
+        self.pending = pending
+        self._keys: dict[tuple[str, str], KeySet | None] = {}
+        self._placeholders: set[tuple[str, str, int]] = set()
+        self._pending_refs: set[str] | None = None
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    def reset(self) -> None:
+        with self._lock:
+            self._keys.clear()
+            self._pending_refs = None
+
+    def invalidate(self, table: str) -> None:
+        """
+        `table` se acaba de cargar: olvida sus claves cacheadas y revisa las
+        FKs colgantes que apuntan a ella.
+        """
+        with self._lock:
+            for ref in [r for r in self._keys if r[0] == table]:
+                del self._keys[ref]
+        self._recheck(table)
+
+    # --------------------------------------------------
+    def _recheck(self, table: str) -> None:
+        if self.pending is None:
+            return
+        with self._lock:
+            refs = self._pending_refs
+        if refs is None:
+            refs = self.pending.ref_tables()        # una consulta por run
+            with self._lock:
+                self._pending_refs = refs = refs | (self._pending_refs or set())
+        if table not in refs:
+            return
+        entries = self.pending.entries(table)
+        found = np.zeros(len(entries), dtype=bool)
+        for ref_column, idx in entries.groupby("ref_column").groups.items():
+            keys = self._ref_keys(table, ref_column)
+            if keys is not None:
+                found[entries.index.get_indexer(idx)] = keys.contains(
+                    entries.loc[idx, "missing_key"].to_numpy(dtype=np.int64))
+        if found.any():
+            marked = self.pending.resolve(entries[found])
+            logger.info("   FK: %s filas que apuntaban a claves nuevas de %s se recargarán.",
+                        marked, table)
+        if found.all():
+            with self._lock:
+                self._pending_refs.discard(table)
+
+    def _note_pending(self, cfg: dict, fk: dict, df: pd.DataFrame, invalid: np.ndarray) -> None:
+        if self.pending is None or cfg["primary_key"] not in df.columns:
+            return
+        self.pending.record(
+            cfg["target_table"], cfg["primary_key"], fk["column"], fk["ref_table"],
+            fk["ref_column"], df[cfg["primary_key"]].to_numpy()[invalid],
+            df[fk["column"]].to_numpy()[invalid],
+        )
+        with self._lock:
+            if self._pending_refs is not None:
+                self._pending_refs.add(fk["ref_table"])
+
+    # --------------------------------------------------
+    def _ref_keys(self, table: str, column: str) -> KeySet | None:
+        with self._lock:
+            if (table, column) in self._keys:
+                return self._keys[(table, column)]
+        arr = self.key_loader(table, column)
+        keys = None if arr is None else KeySet(arr)
+        if keys is None:
+            logger.warning("   FK: %s no existe en destino; no se valida %s.%s.",
+                           table, table, column)
+        with self._lock:
+            self._keys[(table, column)] = keys
+        return keys
+
+    def _ensure_placeholder(self, table: str, column: str, key: int) -> None:
+        with self._lock:
+            if (table, column, key) in self._placeholders:
+                return
+        self.placeholder_writer(table, column, key)
+        with self._lock:
+            self._placeholders.add((table, column, key))
+            keys = self._keys.get((table, column))
+            if keys is not None:
+                self._keys[(table, column)] = keys.union(KeySet([key]))
+
+    # --------------------------------------------------
+    def apply(self, key: str, cfg: dict, df: pd.DataFrame) -> pd.DataFrame:
+        cleaning = cfg.get("data_cleaning") or {}
+        mode = cleaning.get("handle_invalid_foreign_keys")
+        if mode not in MODES or not cfg.get("foreign_keys"):
+            return df
+        placeholder = int(cleaning.get("placeholder_key", PLACEHOLDER_KEY))
+
+        for fk in cfg["foreign_keys"]:
+            col = fk["column"]
+            if col not in df.columns:
+                continue
+            ref_keys = self._ref_keys(fk["ref_table"], fk["ref_column"])
+            if ref_keys is None:
+                continue
+            values = df[col]
+            present = values.notna().to_numpy()
+            invalid = present.copy()
+            invalid[present] = ~ref_keys.contains(values[present].to_numpy(dtype=np.int64))
+            if not invalid.any():
+                continue
+
+            logger.info("   FK %s.%s: %s claves inválidas → %s.", key, col, int(invalid.sum()),
+                        placeholder if mode == "add_placeholder" else "NULL")
+            self._note_pending(cfg, fk, df, invalid)
+            if mode == "add_placeholder":
+                self._ensure_placeholder(fk["ref_table"], fk["ref_column"], placeholder)
+                df.loc[invalid, col] = placeholder
+            else:
+                # Int64 y no object: la columna se sigue creando como entero
+                df[col] = df[col].astype("Int64")
+                df.loc[invalid, col] = pd.NA
+        return df
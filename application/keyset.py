@@ -0,0 +1,216 @@
+# application/keyset.py
+"""
+Conjunto compacto de PKs enteras (todas las de Sigrid son `ide` int).
+
+Internamente son rangos cerrados [start, end] ordenados y disjuntos en dos
+arrays NumPy int64. Con PKs autoincrementales (altas en bloque, primera
+carga, tablas referenciadas por FK) un rango cubre miles de claves y el
+conjunto ocupa 16 bytes por rango. Si las claves están dispersas (pocos
+rangos largos), `starts` y `ends` son el mismo array: 8 bytes por clave,
+que sigue siendo ~4,5× menos que una lista de `int` de Python.
+
+Las operaciones (pertenencia, unión, intersección, diferencia, troceo)
+trabajan sobre los rangos sin expandirlos; `array` materializa las claves
+cuando hace falta (un chunk). La serialización guarda los rangos con
+deltas + zlib.
+"""
+from __future__ import annotations
+import zlib
+import numpy as np
+
+_EMPTY = np.empty(0, dtype=np.int64)
+_MAGIC = b"KS1"
+
+
+def _runs(arr: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Rangos de claves consecutivas de un array ordenado y sin duplicados."""
+    if not len(arr):
+        return _EMPTY, _EMPTY
+    breaks = np.flatnonzero(np.diff(arr) != 1)
+    starts = np.concatenate(([arr[0]], arr[breaks + 1]))
+    ends = np.concatenate((arr[breaks], [arr[-1]]))
+    return starts, ends
+
+
+class KeySet:
+    __slots__ = ("starts", "ends", "_len")
+
+    def __init__(self, values=None, *, _sorted: bool = False) -> None:
+        if values is None:
+            arr = _EMPTY
+        else:
+            arr = np.asarray(values, dtype=np.int64)
+            if not _sorted:
+                arr = np.unique(arr)
+        self._set(*_runs(arr), arr)
+
+    def _set(self, starts: np.ndarray, ends: np.ndarray, arr: np.ndarray | None = None) -> None:
+        """
+        Guarda rangos maximales; si no compensan frente a las claves sueltas
+        (2 enteros por rango), guarda las claves (`starts is ends`).
+        """
+        n = int((ends - starts).sum()) + len(starts)
+        if 2 * len(starts) > n:
+            arr = arr if arr is not None and len(arr) == n else self._expand(starts, ends)
+            starts = ends = arr
+        self.starts, self.ends, self._len = starts, ends, n
+
+    @classmethod
+    def from_ranges(cls, starts, ends) -> KeySet:
+        """Desde rangos cerrados ordenados, disjuntos y no contiguos."""
+        ks = cls.__new__(cls)
+        ks._set(np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64))
+        return ks
+
+    # --------------------------------------------------
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+    def __iter__(self):
+        return iter(self.array.tolist())
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, KeySet) or len(self) != len(other):
+            return False
+        a, b = self.ranges(), other.ranges()
+        return np.array_equal(a[0], b[0]) and np.array_equal(a[1], b[1])
+
+    def __repr__(self) -> str:
+        return f"KeySet({len(self)} claves, {len(self.ranges()[0])} rangos)"
+
+    @property
+    def nbytes(self) -> int:
+        return self.starts.nbytes + (0 if self.ends is self.starts else self.ends.nbytes)
+
+    @staticmethod
+    def _expand(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        lengths = ends - starts + 1
+        if not len(starts):
+            return _EMPTY
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return np.arange(lengths.sum(), dtype=np.int64) + offsets
+
+    @property
+    def array(self) -> np.ndarray:
+        """Claves como array int64 ordenado (se expande si hay rangos)."""
+        if self.ends is self.starts:
+            return self.starts
+        return self._expand(self.starts, self.ends)
+
+    def ranges(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rangos cerrados [start, end] de claves consecutivas.
+        """
+        if self.ends is self.starts:
+            return _runs(self.starts)
+        return self.starts, self.ends
+
+    # --------------------------------------------------
+    def contains(self, values) -> np.ndarray:
+        """
+        Máscara booleana: qué `values` están en el conjunto (searchsorted).
+        """
+        values = np.asarray(values, dtype=np.int64)
+        if not self._len:
+            return np.zeros(len(values), dtype=bool)
+        pos = np.searchsorted(self.starts, values, side="right") - 1
+        inside = pos >= 0
+        pos[~inside] = 0
+        return inside & (values <= self.ends[pos])
+
+    def union(self, *others: KeySet) -> KeySet:
+        parts = [self] + [o for o in others if len(o)]
+        if len(parts) == 1:
+            return self
+        starts = np.concatenate([p.starts for p in parts])
+        ends = np.concatenate([p.ends for p in parts])
+        order = np.argsort(starts, kind="stable")
+        starts, ends = starts[order], np.maximum.accumulate(ends[order])
+        # empieza rango nuevo donde no solapa ni es contiguo con lo anterior
+        first = np.concatenate(([True], starts[1:] > ends[:-1] + 1))
+        last = np.concatenate((first[1:], [True]))
+        return KeySet.from_ranges(starts[first], ends[last])
+
+    def _sweep(self, other: KeySet, keep) -> KeySet:
+        """
+        Barrido por fronteras de rango de ambos conjuntos: entre dos
+        fronteras consecutivas la pertenencia a cada uno es constante, y
+        `keep(en_self, en_other)` decide qué tramos se quedan.
+        """
+        a_s, a_e = self.starts, self.ends
+        b_s, b_e = other.starts, other.ends
+        points = np.concatenate((a_s, a_e + 1, b_s, b_e + 1))
+        d_a = np.concatenate((np.ones(len(a_s), np.int64), -np.ones(len(a_s), np.int64),
+                              np.zeros(2 * len(b_s), np.int64)))
+        d_b = np.concatenate((np.zeros(2 * len(a_s), np.int64),
+                              np.ones(len(b_s), np.int64), -np.ones(len(b_s), np.int64)))
+        order = np.argsort(points, kind="stable")
+        points, d_a, d_b = points[order], d_a[order], d_b[order]
+        bounds, first = np.unique(points, return_index=True)
+        in_a = np.cumsum(np.add.reduceat(d_a, first)) > 0
+        in_b = np.cumsum(np.add.reduceat(d_b, first)) > 0
+        # tramo i = [bounds[i], bounds[i + 1] - 1]
+        sel = keep(in_a[:-1], in_b[:-1])
+        starts, ends = bounds[:-1][sel], bounds[1:][sel] - 1
+        if not len(starts):
+            return KeySet()
+        # tramos seleccionados contiguos → un solo rango
+        new = np.concatenate(([True], starts[1:] > ends[:-1] + 1))
+        last = np.concatenate((new[1:], [True]))
+        return KeySet.from_ranges(starts[new], ends[last])
+
+    def intersection(self, other: KeySet) -> KeySet:
+        if not self or not other:
+            return KeySet()
+        return self._sweep(other, lambda a, b: a & b)
+
+    def difference(self, other: KeySet) -> KeySet:
+        if not self or not other:
+            return self
+        return self._sweep(other, lambda a, b: a & ~b)
+
+    # --------------------------------------------------
+    def chunks(self, size: int):
+        """
+        Sub-conjuntos consecutivos de hasta `size` claves, partiendo rangos
+        si hace falta (sin expandir el conjunto entero).
+        """
+        if self.ends is self.starts:
+            for i in range(0, self._len, size):
+                yield KeySet(self.starts[i : i + size], _sorted=True)
+            return
+        cum_end = np.cumsum(self.ends - self.starts + 1)
+        cum_start = cum_end - (self.ends - self.starts + 1)
+        for lo in range(0, self._len, size):
+            hi = min(lo + size, self._len)
+            i0 = int(np.searchsorted(cum_end, lo, side="right"))
+            i1 = int(np.searchsorted(cum_start, hi, side="left"))
+            starts = self.starts[i0:i1].copy()
+            ends = self.ends[i0:i1].copy()
+            starts[0] += lo - cum_start[i0]
+            ends[-1] -= cum_end[i1 - 1] - hi
+            yield KeySet.from_ranges(starts, ends)
+
+    # --------------------------------------------------
+    def to_bytes(self) -> bytes:
+        starts, ends = self.ranges()
+        # deltas: start_i - end_{i-1} y longitud de cada rango → enteros pequeños
+        gaps = starts.copy()
+        gaps[1:] = starts[1:] - ends[:-1]
+        payload = np.stack([gaps, ends - starts]).astype("<i8").tobytes()
+        return _MAGIC + zlib.compress(payload, 6)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> KeySet:
+        if not data.startswith(_MAGIC):
+            raise ValueError("Formato KeySet desconocido.")
+        flat = np.frombuffer(zlib.decompress(data[len(_MAGIC):]), dtype="<i8")
+        if not len(flat):
+            return cls()
+        gaps, spans = flat.reshape(2, -1)
+        # start_0 = gap_0 ; start_i = end_{i-1} + gap_i ; end_i = start_i + span_i
+        starts = np.cumsum(gaps + np.concatenate(([0], spans[:-1])))
+        return cls.from_ranges(starts, starts + spans)
@@ -0,0 +1,151 @@
+# application/resilient_sink.py
+from __future__ import annotations
+import logging
+import numpy as np
+from application.keyset import KeySet
+from infrastructure.retry import call_with_retry, error_signature, is_data_error, is_transient
+
+logger = logging.getLogger(__name__)
+
+
+class _ChunkState:
+    """
+    Bisección de un lote de primer nivel. Las filas aisladas se retienen
+    (`held`) hasta que algo del lote se carga: si las primeras filas fallan
+    todas con el mismo error el problema es de esquema o de código y se
+    aborta sin llenar la cuarentena.
+    """
+    def __init__(self, rows: int) -> None:
+        self.rows = rows
+        self.loaded = 0
+        self.held: list = []                    # [(df, exc)] aún sin registrar
+
+
+class ResilientSink:
+    """
+    Envuelve un sink para que un chunk problemático no aborte el run:
+
+    - errores transitorios (deadlock, conexión perdida…) → reintento con
+      backoff exponencial del mismo lote;
+    - errores de datos (overflow, encoding, NOT NULL…) → bisección del
+      lote hasta aislar las filas culpables, que van a cuarentena mientras
+      el resto se carga.
+
+    Cualquier otro error (p. ej. columna inexistente) se propaga. En un lote
+    de al menos `abort_min_rows` filas, si las primeras `abort_after` filas
+    aisladas fallan con el mismo error sin que se haya cargado ninguna, se
+    aborta: es un fallo de esquema o de código, no filas sueltas.
+
+    Las filas en cuarentena cuyo hash de origen no ha cambiado no se
+    vuelven a extraer (`skip_quarantined`).
+
+    Con sinks asíncronos (los que exponen `flush` y `drain_failures`) los
+    lotes fallidos se recogen al inicio de `finish` y se recargan por su vía
+    síncrona (`write_sync`) con el mismo tratamiento, antes del `finish`
+    del sink.
+    """
+    def __init__(self, sink, quarantine, *, attempts: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0,
+                 abort_after: int = 20, abort_min_rows: int = 100) -> None:
+        self.sink = sink
+        self.name = sink.name
+        self.quarantine = quarantine
+        self.retry_kw = {"attempts": attempts, "base_delay": base_delay,
+                         "max_delay": max_delay}
+        self.abort_after = abort_after
+        self.abort_min_rows = abort_min_rows
+        self.quarantined = 0
+
+    def __getattr__(self, attr):
+        return getattr(self.sink, attr)
+
+    # --------------------------------------------------
+    def read_hashes(self, cfg: dict):
+        return call_with_retry(self.sink.read_hashes, cfg, **self.retry_kw)
+
+    def skip_quarantined(self, key: str, cfg: dict, hash_src, ids: KeySet) -> KeySet:
+        """
+        Quita de `ids` las claves en cuarentena cuyo hash de origen sigue
+        siendo el mismo: fallarían igual y duplicarían la cuarentena.
+        """
+        stuck = self.quarantine.hashes(key, self.name)
+        if stuck.empty or not ids:
+            return ids
+        pk = cfg["primary_key"]
+        src = hash_src[[pk, "hash_crc32"]].rename(columns={pk: "pk_value"})
+        same = src.astype({"pk_value": "int64", "hash_crc32": "int64"}).merge(
+            stuck.astype({"pk_value": "int64", "hash_crc32": "int64"}),
+            on=["pk_value", "hash_crc32"],
+        )
+        if same.empty:
+            return ids
+        skipped = KeySet(same["pk_value"].to_numpy(dtype=np.int64))
+        remaining = ids.difference(skipped)
+        if len(remaining) != len(ids):
+            logger.info("   %s (%s): %s filas en cuarentena sin cambios en origen; se omiten.",
+                        key, self.name, len(ids) - len(remaining))
+        return remaining
+
+    # --------------------------------------------------
+    def write(self, key: str, cfg: dict, df) -> None:
+        self._write_chunk(self.sink.write, key, cfg, df)
+
+    def _write_chunk(self, fn, key: str, cfg: dict, df) -> None:
+        state = _ChunkState(len(df))
+        self._write(fn, key, cfg, df, state)
+        self._flush(key, cfg, state)
+
+    def _flush(self, key: str, cfg: dict, state: _ChunkState) -> None:
+        for row, exc in state.held:
+            self.quarantine.record(key, cfg, self.name, row, exc)
+            self.quarantined += 1
+        state.held.clear()
+
+    def _write(self, fn, key: str, cfg: dict, df, state: _ChunkState) -> None:
+        """Carga `df` bisecando errores de datos."""
+        try:
+            call_with_retry(fn, key, cfg, df, **self.retry_kw)
+        except Exception as exc:                     # pylint: disable=broad-except
+            if not is_data_error(exc):
+                raise
+            if len(df) == 1:
+                self._isolate(key, cfg, df, exc, state)
+                return
+            logger.info("   Error de datos en lote de %s filas (%s); bisecando…",
+                        len(df), exc.__class__.__name__)
+            mid = len(df) // 2
+            self._write(fn, key, cfg, df.iloc[:mid], state)
+            self._write(fn, key, cfg, df.iloc[mid:], state)
+            return
+        state.loaded += len(df)
+        if state.held:
+            self._flush(key, cfg, state)
+
+    def _isolate(self, key: str, cfg: dict, row, exc: BaseException, state: _ChunkState) -> None:
+        if state.loaded:
+            self.quarantine.record(key, cfg, self.name, row, exc)
+            self.quarantined += 1
+            return
+        state.held.append((row, exc))
+        if state.rows < self.abort_min_rows or len(state.held) < self.abort_after:
+            return
+        signature = error_signature(exc)
+        if all(error_signature(e) == signature for _, e in state.held):
+            raise RuntimeError(
+                f"{key} → {self.name}: las primeras {len(state.held)} filas del lote de "
+                f"{state.rows} fallan con el mismo error y ninguna se ha cargado; "
+                f"parece un fallo de esquema o de código ({signature[0]}: {exc})"
+            ) from exc
+
+    # --------------------------------------------------
+    def finish(self, key: str, cfg: dict) -> None:
+        # primero se recargan los lotes async fallidos: el finish del sink
+        # (placeholder, índices, ANALYZE) debe ver la tabla completa
+        drain = getattr(self.sink, "drain_failures", None)
+        if drain is not None:
+            self.sink.flush(key, cfg)
+            for f_key, f_cfg, df, exc in drain():
+                if not (is_transient(exc) or is_data_error(exc)):
+                    raise exc
+                self._write_chunk(self.sink.write_sync, f_key, f_cfg, df)
+        self.sink.finish(key, cfg)
@@ -0,0 +1,133 @@
+# application/scheduler.py
+"""
+Planificación por tabla para el modo servicio.
+
+Formatos admitidos en `TABLE_CONFIG[...]['schedule']`:
+
+- "every 5m" / "every 2h" / "every 30s" / "every 1d":  intervalo fijo
+- cron de 5 campos ("*/10 * * * *", "0 2 * * *", "15 6 * * 1-5")
+"""
+from __future__ import annotations
+import re
+from datetime import datetime, timedelta
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_INTERVAL_RE = re.compile(r"^every\s+(\d+)\s*([smhd])$", re.IGNORECASE)
+
+# (mínimo, máximo) de cada campo cron
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+class IntervalSchedule:
+    def __init__(self, seconds: int) -> None:
+        if seconds <= 0:
+            raise ValueError("El intervalo debe ser positivo.")
+        self.delta = timedelta(seconds=seconds)
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + self.delta
+
+    def __repr__(self) -> str:
+        return f"IntervalSchedule({int(self.delta.total_seconds())}s)"
+
+
+class CronSchedule:
+    """
+    Cron clásico de 5 campos (min hora día mes día-semana, 0 = domingo).
+    Soporta `*`, `a-b`, listas `a,b` y pasos `*/n` / `a-b/n`.
+    """
+    def __init__(self, expr: str) -> None:
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron inválido '{expr}': se esperan 5 campos.")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(p, lo, hi) for p, (lo, hi) in zip(parts, _CRON_FIELDS)
+        )
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    # --------------------------------------------------
+    def _day_matches(self, moment: datetime) -> bool:
+        dom = moment.day in self.days
+        dow = (moment.isoweekday() % 7) in self.weekdays
+        # semántica cron: si ambos campos están restringidos basta uno
+        if self._any_day or self._any_weekday:
+            return dom and dow
+        return dom or dow
+
+    # --------------------------------------------------
+    def next_after(self, moment: datetime) -> datetime:
+        cand = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = cand + timedelta(days=366 * 4)
+        while cand < limit:
+            if cand.month not in self.months:
+                cand = (cand.replace(day=1, hour=0, minute=0)
+                        + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(cand):
+                cand = cand.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if cand.hour not in self.hours:
+                cand = cand.replace(minute=0) + timedelta(hours=1)
+                continue
+            if cand.minute not in self.minutes:
+                cand += timedelta(minutes=1)
+                continue
+            return cand
+        raise ValueError(f"Cron '{self.expr}' no tiene ejecuciones próximas.")
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expr!r})"
+
+
+def _parse_field(field: str, lo: int, hi: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in field.split(","):
+        rng, _, step = part.partition("/")
+        if rng == "*":
+            start, end = lo, hi
+        elif "-" in rng:
+            start, end = (int(x) for x in rng.split("-", 1))
+        else:
+            start = end = int(rng)
+            if step:
+                end = hi
+        if start < lo or end > hi or start > end:
+            raise ValueError(f"Campo cron fuera de rango: '{field}'")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return frozenset(values)
+
+
+# --------------------------------------------------------------------------- #
+def parse_schedule(spec: str):
+    m = _INTERVAL_RE.match(spec.strip())
+    if m:
+        return IntervalSchedule(int(m.group(1)) * _UNITS[m.group(2).lower()])
+    return CronSchedule(spec)
+
+
+class TableScheduler:
+    """
+    Lleva la próxima ejecución de cada tabla y devuelve las que tocan.
+    """
+    def __init__(self, table_config: dict, tables: list[str], default: str) -> None:
+        self.schedules = {
+            key: parse_schedule(table_config.get(key, {}).get("schedule") or default)
+            for key in tables
+        }
+        self.next_run: dict[str, datetime] = {}
+
+    # --------------------------------------------------
+    def start(self, now: datetime, *, run_now: bool = False) -> None:
+        for key, sched in self.schedules.items():
+            self.next_run[key] = now if run_now else sched.next_after(now)
+
+    # --------------------------------------------------
+    def due(self, now: datetime) -> list[str]:
+        return [k for k, t in self.next_run.items() if t <= now]
+
+    # --------------------------------------------------
+    def mark_done(self, key: str, now: datetime) -> None:
+        if key in self.schedules:
+            self.next_run[key] = self.schedules[key].next_after(now)
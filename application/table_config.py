@@ -6,11 +6,29 @@ Mapa con las reglas ETL por tabla:
 - target_table: nombre deseado en PostgreSQL
 - primary_key:  clave primaria en destino
 - rename_columns:  {src: dst}
-- date_columns:  lista de columnas a convertir a date/datetime
+- date_columns:  lista de columnas YYYYMMDD a convertir a datetime (nombre
+                 renombrado); 0/99991231/99999999 pasan a NULL
+- date_columns_by_source: (opcional) admite también el nombre de origen en
+                 date_columns. Si la columna ya existe como INTEGER en destino
+                 hay que migrarla antes (ALTER … TYPE timestamp USING …)
+- date_sentinels: (opcional) centinelas YYYYMMDD adicionales a tratar como NULL
 - foreign_keys:   para validaciones o FK en Postgres
 - join_with_con:  info para joins con la tabla `con`
 - data_cleaning:  directivas de limpieza
 - combine_columns: creación de columnas nuevas combinando otras
+- schedule:       (opcional) planificación en modo servicio, "every 5m" o cron
+                  de 5 campos; por defecto Config.ETL_DEFAULT_SCHEDULE
+- include_columns: (opcional) solo estas columnas del origen (la PK siempre)
+- exclude_columns: (opcional) columnas del origen a no leer (textos/blobs…)
+- source_filter:  (opcional) predicado SQL Server empujado a hashes y extracción,
+                  p. ej. "fec >= 20200101"
+- partitioning:   (opcional) particionado del destino en PostgreSQL, ver
+                  infrastructure/pg_partitions.py; p. ej. {'method': 'range',
+                  'interval': 1_000_000} (por PK) o {'column': 'fec'} (por año)
+- maintenance:    (opcional) ajustes de infrastructure/pg_maintenance.py:
+                  {'fillfactor': 80, 'analyze_fraction': 0.05,
+                   'covering_index': False (solo PK → UPDATE HOT)}
+- parquet:        (opcional) {'partition_by_year': <columna fecha>} para el sink Parquet
 """
 
 TABLE_CONFIG = {
@@ -18,6 +36,7 @@ TABLE_CONFIG = {
         'source_table': 'obr',
         'target_table': 'FactObra',
         'primary_key': 'ide',
+        'partitioning': {'method': 'range', 'interval': 1_000_000},
         'rename_columns': {
             'res': 'nombre_obra'
         },
@@ -144,6 +163,7 @@ TABLE_CONFIG = {
         'source_table': 'dcapro',
         'target_table': 'DimAlbaranCompraProductos',
         'primary_key': 'ide',
+        'partitioning': {'method': 'range', 'interval': 1_000_000},
         'rename_columns': {},
         'date_columns': ['fec','garfec','fecimp'],
         'foreign_keys': [],
@@ -452,6 +472,7 @@ TABLE_CONFIG = {
         'source_table': 'hmores',
         'target_table': 'DimPartesTrabajoDetalle',  # Ajusta el nombre a tu convención
         'primary_key': 'ide',
+        'partitioning': {'method': 'range', 'interval': 1_000_000},
         'rename_columns': {
             # Añade renombrados de columnas si lo necesitas, ejemplo:
             # 'tex': 'descripcion_detalle'
@@ -0,0 +1,133 @@
+# application/transform_pool.py
+"""
+Etapa de transformación en varios procesos.
+
+Con la extracción y la carga ya solapadas, `TransformPlan.apply` en un solo
+núcleo (GIL) pasa a ser el cuello de botella en tablas con muchas fechas.
+`TransformPool` reparte los chunks entre `workers` procesos sin serializar
+DataFrames con pickle: cada lote viaja como Arrow IPC dentro de un
+segmento `multiprocessing.shared_memory`, y el resultado vuelve igual.
+
+`submit()` devuelve un Future; el llamante los consume en orden de envío,
+así que el orden de los chunks de una tabla se conserva aunque terminen
+desordenados.
+
+Requiere pyarrow (dependencia opcional, solo se importa aquí).
+"""
+from __future__ import annotations
+import logging, multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import pandas as pd
+import pyarrow as pa
+
+from application.transforms import TransformPlan
+
+logger = logging.getLogger(__name__)
+
+
+# ───── Arrow IPC ⇄ memoria compartida ──────────────────────────────────────
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """
+    Quita el segmento del resource_tracker de este proceso: lo libera (unlink)
+    el otro extremo, no este al salir.
+    """
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")   # pylint: disable=protected-access
+    except Exception:                                               # pylint: disable=broad-except
+        pass
+
+
+def _to_shm(df: pd.DataFrame, *, track: bool = True) -> tuple[str, int]:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    data = sink.getvalue()
+    shm = shared_memory.SharedMemory(create=True, size=max(data.size, 1))
+    try:
+        shm.buf[:data.size] = memoryview(data).cast("B")
+    finally:
+        shm.close()
+        if not track:
+            _untrack(shm)
+    return shm.name, data.size
+
+
+def _from_shm(name: str, size: int, *, unlink: bool) -> pd.DataFrame:
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # una sola copia del segmento: ninguna vista Arrow queda apuntando
+        # a él y puede cerrarse/liberarse enseguida
+        data = pa.py_buffer(bytes(shm.buf[:size]))
+    finally:
+        shm.close()
+        if unlink:
+            shm.unlink()
+        else:
+            _untrack(shm)
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+
+# ───── Proceso trabajador ──────────────────────────────────────────────────
+_PLANS: dict[tuple, TransformPlan] = {}
+
+
+def _transform_batch(key: str, cfg: dict, name: str, size: int) -> tuple[str, int]:
+    df = _from_shm(name, size, unlink=False)
+    cache_key = (key, tuple(df.columns))
+    plan = _PLANS.get(cache_key)
+    if plan is None:
+        plan = _PLANS[cache_key] = TransformPlan(cfg, df.columns)
+    return _to_shm(plan.apply(df), track=False)
+
+
+# ───── Pool ────────────────────────────────────────────────────────────────
+class TransformPool:
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        # spawn: el proceso principal ya tiene hilos (pools, loader async)
+        # y fork los copiaría a medias; también es lo único que hay en Windows
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info("Transformación en %s procesos (Arrow IPC + shared memory).", workers)
+
+    # --------------------------------------------------
+    def submit(self, key: str, cfg: dict, df: pd.DataFrame) -> Future:
+        """
+        Envía un chunk a transformar; el Future resuelve al DataFrame
+        transformado (y libera los dos segmentos de memoria compartida).
+        """
+        name, size = _to_shm(df)
+        result: Future = Future()
+        try:
+            inner = self._pool.submit(_transform_batch, key, cfg, name, size)
+        except BaseException:
+            _release(name)
+            raise
+
+        def done(fut: Future) -> None:
+            _release(name)
+            try:
+                out_name, out_size = fut.result()
+                result.set_result(_from_shm(out_name, out_size, unlink=True))
+            except BaseException as exc:                # pylint: disable=broad-except
+                result.set_exception(exc)
+
+        inner.add_done_callback(done)
+        return result
+
+    # --------------------------------------------------
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _release(name: str) -> None:
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
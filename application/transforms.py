@@ -0,0 +1,43 @@
+# application/transforms.py
+from __future__ import annotations
+import pandas as pd
+
+from application.date_decoding import SIGRID_DATE_SENTINELS, decode_date_columns
+
+
+# ───── Transformaciones básicas ────────────────────────────────────────────
+class TransformPlan:
+    """
+    Plan de transformación de una tabla, resuelto una sola vez para un
+    conjunto de columnas de origen y reutilizado en cada chunk/ciclo.
+    """
+    def __init__(self, cfg: dict, columns) -> None:
+        columns = list(columns)
+        self.columns = tuple(columns)
+        self.rename = {
+            src: dst for src, dst in (cfg.get("rename_columns") or {}).items()
+            if src in columns
+        }
+        renamed = {self.rename.get(c, c) for c in columns}
+        # date_columns se refiere al nombre ya renombrado; con
+        # `date_columns_by_source` también al de origen (opt-in: cambia el
+        # tipo de columnas que ya existen como INTEGER en destino)
+        dates = cfg.get("date_columns", [])
+        if cfg.get("date_columns_by_source"):
+            dates = (self.rename.get(c, c) for c in dates)
+        self.date_columns = list(dict.fromkeys(c for c in dates if c in renamed))
+        self.date_sentinels = (
+            SIGRID_DATE_SENTINELS + tuple(cfg.get("date_sentinels") or ())
+        )
+
+    # --------------------------------------------------
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.rename:
+            df = df.rename(columns=self.rename)
+        if self.date_columns:
+            df = decode_date_columns(df, self.date_columns, sentinels=self.date_sentinels)
+        return df
+
+
+def transform_df(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
+    return TransformPlan(cfg, df.columns).apply(df)
@@ -0,0 +1,330 @@
+# application/use_cases/incremental_etl.py
+from __future__ import annotations
+import logging, time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from application.diff import diff_hashes
+from application.extraction_planner import (
+    ExtractionGroup,
+    branch_columns,
+    fk_waves,
+    group_columns,
+    needs_projection,
+    plan_extraction,
+)
+from application.keyset import KeySet
+from application.table_config import TABLE_CONFIG
+from application.transforms import TransformPlan
+from infrastructure.pg_metadata import PgMetadataCache
+from infrastructure.postgres_sink import PostgresSink
+from infrastructure.retry import call_with_retry
+from infrastructure.sql_source import SQLServerSource
+
+
+class IncrementalETLUseCase:
+    """
+    ETL incremental por tabla: hashes origen vs destino, carga de las PKs
+    nuevas/modificadas en chunks y upsert en PostgreSQL.
+
+    Con varios `sinks` (p. ej. PostgreSQL + Parquet) cada uno calcula su
+    propio diff, el origen se lee una sola vez para la unión de PKs y cada
+    chunk transformado se reparte a los sinks que lo necesitan. Lo mismo
+    entre configs con la misma `source_table` (ver extraction_planner):
+    un escaneo de hashes y una lectura por grupo, una rama por config.
+
+    Con `transforms` (TransformPool) los chunks se transforman en otros
+    procesos mientras el hilo principal sigue extrayendo y cargando; los
+    resultados se consumen en orden de envío (orden de chunks intacto).
+
+    La instancia es reutilizable: engines (pools), metadatos del destino y
+    planes de transformación se conservan entre ejecuciones.
+    """
+    def __init__(
+        self,
+        *,
+        sql_engine,
+        pg_engine,
+        table_config: dict | None = None,
+        chunk: int = 50_000,
+        metadata: PgMetadataCache | None = None,
+        dry_run: bool = False,
+        history=None,
+        sinks: list | None = None,
+        cache=None,
+        retry: dict | None = None,
+        fk_validator=None,
+        transforms=None,
+        name: str | None = None,
+        profiler=None,
+    ) -> None:
+        self.sql_engine = sql_engine
+        self.pg_engine = pg_engine
+        self.table_config = table_config if table_config is not None else TABLE_CONFIG
+        self.chunk = chunk
+        self.metadata = metadata or PgMetadataCache(pg_engine)
+        self.dry_run = dry_run
+        self.history = history
+        self.sinks = sinks if sinks is not None else [PostgresSink(pg_engine, self.metadata)]
+        self.cache = cache
+        # kwargs de call_with_retry para las lecturas del origen
+        self.retry = retry or {"attempts": 1}
+        self.fk_validator = fk_validator
+        self.transforms = transforms
+        self.profiler = profiler
+        self.name = name
+        self._source_columns: dict[str, dict[str, str]] = {}     # esquema origen
+        self._plans: dict[tuple[str, tuple], TransformPlan] = {}
+        # con varios orígenes cada uno loguea como etl_incremental.<origen>
+        self.log = logging.getLogger("etl_incremental" + (f".{name}" if name else ""))
+
+    # --------------------------------------------------
+    def execute(self, tables: list[str], *, parallel: int = 1) -> None:
+        groups = plan_extraction(tables, self.table_config)
+        if self.fk_validator is not None:
+            self.fk_validator.reset()
+        if parallel > 1 and len(groups) > 1:
+            # una conexión del pool por hilo; el primer error aborta el run.
+            # Por oleadas de FKs: las tablas referenciadas terminan antes de
+            # que se carguen (y validen) las que dependen de ellas.
+            with ThreadPoolExecutor(max_workers=parallel) as pool:
+                for wave in fk_waves(groups, self.table_config):
+                    for _ in pool.map(self._run_group_conn, wave):
+                        pass
+        else:
+            with self.sql_engine.connect() as sql_conn:
+                source = SQLServerSource(sql_conn, self._source_columns)
+                for group in groups:
+                    self._run_group(group, source)
+        self.log.info("🏁 ETL incremental finalizado OK.")
+
+    # --------------------------------------------------
+    def close(self) -> None:
+        """
+        Libera recursos de los sinks que los tengan (pools async, hilos…)
+        y el pool de procesos de transformación.
+        """
+        if self.transforms is not None:
+            self.transforms.close()
+        if self.profiler is not None:
+            self.profiler.close()
+        for sink in self.sinks:
+            close = getattr(sink, "close", None)
+            if close is not None:
+                close()
+
+    # --------------------------------------------------
+    def plan(self, tables: list[str]) -> list[ExtractionGroup]:
+        """Grupos de extracción (un escaneo por origen) en orden de FKs."""
+        return plan_extraction(tables, self.table_config)
+
+    def run_group(self, group: ExtractionGroup) -> dict[str, int]:
+        """Ejecuta un grupo suelto (daemon): {clave: filas cargadas}."""
+        if self.fk_validator is not None:
+            self.fk_validator.reset()
+        return self._run_group_conn(group)
+
+    def run_table(self, key: str) -> int:
+        groups = self.plan([key])
+        return self.run_group(groups[0]).get(key, 0) if groups else 0
+
+    def _run_group_conn(self, group: ExtractionGroup) -> dict[str, int]:
+        with self.sql_engine.connect() as sql_conn:
+            return self._run_group(group, SQLServerSource(sql_conn, self._source_columns))
+
+    # --------------------------------------------------
+    @staticmethod
+    def _skip_quarantined(sink, key: str, cfg: dict, hash_src, ids: KeySet) -> KeySet:
+        """Sin recargar filas en cuarentena que no han cambiado en origen."""
+        skip = getattr(sink, "skip_quarantined", None)
+        return skip(key, cfg, hash_src, ids) if skip is not None and ids else ids
+
+    # --------------------------------------------------
+    def _stage(self, name: str):
+        """Etapa perfilada con `--profile` (hash, diff, extract, transform, load)."""
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
+    # --------------------------------------------------
+    def _plan(self, key: str, cfg: dict, columns) -> TransformPlan:
+        cache_key = (key, tuple(columns))
+        plan = self._plans.get(cache_key)
+        if plan is None:
+            plan = self._plans[cache_key] = TransformPlan(cfg, columns)
+        return plan
+
+    # --------------------------------------------------
+    def _read(self, source, method: str, *args):
+        return call_with_retry(
+            getattr(source, method), *args, on_retry=source.reset, **self.retry
+        )
+
+    # --------------------------------------------------
+    def _extract(self, source, src, pk, chunk_ids, hash_lookup, columns, where):
+        """
+        Lee un chunk del origen o, si hay caché y la huella coincide, de disco.
+        """
+        if self.cache is None:
+            return self._read(source, "fetch_rows", src, pk, chunk_ids, columns, where)
+        path = self.cache.path_for(
+            src, chunk_ids.array, hash_lookup.loc[chunk_ids.array].to_numpy()
+        )
+        df = self.cache.get(path)
+        if df is None:
+            df = self._read(source, "fetch_rows", src, pk, chunk_ids, columns, where)
+            self.cache.put(path, df)
+        return df
+
+    # --------------------------------------------------
+    def _load(self, key: str, df, pk: str, nbytes: dict, sink_filter: dict) -> None:
+        """
+        Carga un chunk ya transformado (o su Future) de la rama `key`:
+        validación de FKs y reparto a los sinks.
+        """
+        cfg = self.table_config[key]
+        with self._stage("transform"):
+            if isinstance(df, Future):
+                df = df.result()
+            if self.fk_validator is not None:
+                df = self.fk_validator.apply(key, cfg, df)
+        nbytes[key] += int(df.memory_usage(deep=True).sum())
+
+        with self._stage("load"):
+            for sink in self.sinks:
+                part = df
+                if (key, sink.name) in sink_filter:
+                    part = df[sink_filter[(key, sink.name)].contains(df[pk])]
+                    if part.empty:
+                        continue
+                sink.write(key, cfg, part)
+
+    # --------------------------------------------------
+    def _run_group(self, group: ExtractionGroup, source: SQLServerSource) -> dict[str, int]:
+        if self.profiler is None:
+            return self._run_group_stages(group, source)
+        label = "+".join(group.keys)
+        with self.profiler.table(f"{self.name}.{label}" if self.name else label):
+            return self._run_group_stages(group, source)
+
+    def _run_group_stages(self, group: ExtractionGroup, source: SQLServerSource) -> dict[str, int]:
+        src, pk, where = group.source_table, group.primary_key, group.source_filter
+        for key in group.keys:
+            self.log.info("▶ Tabla %s (origen %s → destino %s)",
+                          key, src, self.table_config[key]["target_table"])
+
+        # --- proyección / filtro empujados al origen -------
+        columns, branch_cols = None, {}
+        with self._stage("hash"):
+            if needs_projection(group, self.table_config):
+                all_columns = self._read(source, "columns", src)
+                columns = group_columns(group, self.table_config, all_columns)
+                branch_cols = {
+                    key: branch_columns(self.table_config[key], all_columns)
+                    for key in group.keys
+                }
+                self.log.info("   Proyección: %s de %s columnas.", len(columns), len(all_columns))
+
+            # --- obtener hashes origen (una vez por grupo) -----
+            hash_src = self._read(source, "fetch_hashes", src, pk, columns, where)
+
+        # --- hashes destino (uno por rama y sink) ----------
+        wanted: dict[str, dict[str, KeySet]] = {}
+        branch_ids: dict[str, KeySet] = {}
+        for key in group.keys:
+            cfg = self.table_config[key]
+            with self._stage("diff"):
+                wanted[key] = {
+                    sink.name: self._skip_quarantined(
+                        sink, key, cfg, hash_src,
+                        diff_hashes(hash_src, sink.read_hashes(cfg), pk).to_load,
+                    )
+                    for sink in self.sinks
+                }
+                branch_ids[key] = KeySet().union(*wanted[key].values())
+            self.log.info("   %s: %s filas nuevas/modificadas%s.", key, len(branch_ids[key]),
+                          "" if len(self.sinks) == 1 else " (" + ", ".join(
+                              f"{n}: {len(ids)}" for n, ids in wanted[key].items()) + ")")
+
+        if not self.dry_run:
+            # placeholder de tablas referenciadas aunque no haya cambios
+            # (`finish` solo corre para ramas con filas a cargar)
+            for key in group.keys:
+                for sink in self.sinks:
+                    ensure = getattr(sink, "ensure_placeholder", None)
+                    if ensure is not None:
+                        ensure(self.table_config[key])
+
+        ids_to_load = KeySet().union(*branch_ids.values())
+        if not ids_to_load:
+            self.log.info("   Sin cambios.")
+            return {key: 0 for key in group.keys}
+
+        if len(group.keys) > 1:
+            self.log.info("   %s: %s filas a leer para %s ramas.",
+                          src, len(ids_to_load), len(group.keys))
+        if self.dry_run:
+            self.log.info("   (dry-run) no se carga nada.")
+            return {key: len(ids) for key, ids in branch_ids.items()}
+
+        # ramas/sinks que solo necesitan parte de la unión reciben un filtro
+        branch_filter = {
+            key: ids for key, ids in branch_ids.items()
+            if len(ids) != len(ids_to_load)
+        }
+        sink_filter = {
+            (key, name): ids
+            for key, per_sink in wanted.items() for name, ids in per_sink.items()
+            if len(ids) != len(branch_ids[key])
+        }
+
+        hash_lookup = hash_src.set_index(pk)["hash_crc32"] if self.cache else None
+
+        # --- procesar en chunks ----------------------------
+        started = time.perf_counter()
+        nbytes = dict.fromkeys(group.keys, 0)
+        active = [key for key in group.keys if branch_ids[key]]
+        # transformaciones en vuelo (FIFO: se cargan en orden de chunk)
+        pending: deque[tuple[str, Future | object]] = deque()
+        inflight = 2 * self.transforms.workers if self.transforms is not None else 0
+        for chunk_ids in ids_to_load.chunks(self.chunk):
+            with self._stage("extract"):
+                raw = self._extract(source, src, pk, chunk_ids, hash_lookup, columns, where)
+
+            for n, key in enumerate(active):
+                cfg = self.table_config[key]
+                df = raw
+                if key in branch_filter:
+                    df = raw[branch_filter[key].contains(raw[pk])]
+                    if df.empty:
+                        continue
+                elif n < len(active) - 1 and self.transforms is None:
+                    df = raw.copy()           # cada rama transforma su copia
+                if key in branch_cols and len(branch_cols[key]) != len(columns):
+                    df = df[branch_cols[key] + ["hash_crc32"]]
+                with self._stage("transform"):
+                    if self.transforms is not None:
+                        pending.append((key, self.transforms.submit(key, cfg, df)))
+                    else:
+                        pending.append((key, self._plan(key, cfg, df.columns).apply(df)))
+                while len(pending) > inflight:
+                    self._load(*pending.popleft(), pk, nbytes, sink_filter)
+
+        while pending:
+            self._load(*pending.popleft(), pk, nbytes, sink_filter)
+
+        for key in active:
+            with self._stage("load"):
+                for sink in self.sinks:
+                    sink.finish(key, self.table_config[key])
+            if self.fk_validator is not None:
+                self.fk_validator.invalidate(self.table_config[key]["target_table"])
+        if self.cache is not None:
+            self.log.info("   Caché: %s aciertos / %s fallos.", self.cache.hits, self.cache.misses)
+
+        if self.history is not None:
+            seconds = time.perf_counter() - started
+            for key in active:
+                self.history.record(
+                    key, rows=len(branch_ids[key]), nbytes=nbytes[key], seconds=seconds,
+                )
+        return {key: len(ids) for key, ids in branch_ids.items()}
+
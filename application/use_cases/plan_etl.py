@@ -0,0 +1,117 @@
+# application/use_cases/plan_etl.py
+from __future__ import annotations
+import logging, pandas as pd
+from application.diff import diff_hashes
+from application.extraction_planner import group_columns, needs_projection, plan_extraction
+from application.table_config import TABLE_CONFIG
+from infrastructure.pg_metadata import PgMetadataCache
+from infrastructure.pg_utils import count_rows, fetch_target_hashes
+from infrastructure.sql_source import SQLServerSource
+
+
+class PlanETLUseCase:
+    """
+    Modo plan: calcula por tabla cuántas filas nuevas, modificadas y
+    borradas movería el ETL y estima bytes/tiempo con el histórico de
+    cargas anteriores. No escribe nada en PostgreSQL.
+
+    probe="diff"  → diff completo de hashes (exacto).
+    probe="count" → solo COUNT(*) origen/destino (barato, sin 'modificadas').
+    """
+    def __init__(
+        self,
+        *,
+        sql_engine,
+        pg_engine,
+        history,
+        table_config: dict | None = None,
+        probe: str = "diff",
+    ) -> None:
+        if probe not in ("diff", "count"):
+            raise ValueError(f"probe desconocido: {probe}")
+        self.sql_engine = sql_engine
+        self.pg_engine = pg_engine
+        self.history = history
+        self.table_config = table_config if table_config is not None else TABLE_CONFIG
+        self.probe = probe
+        self.metadata = PgMetadataCache(pg_engine)
+        self._source_columns: dict[str, dict[str, str]] = {}
+        self.log = logging.getLogger(__name__)
+
+    # --------------------------------------------------
+    def execute(self, tables: list[str]) -> list[dict]:
+        plans = []
+        with self.sql_engine.connect() as sql_conn:
+            source = SQLServerSource(sql_conn, self._source_columns)
+            # mismos grupos que el ETL: un escaneo por origen y mismo CHECKSUM
+            for group in plan_extraction(tables, self.table_config):
+                columns = None
+                if needs_projection(group, self.table_config):
+                    columns = group_columns(group, self.table_config,
+                                            source.columns(group.source_table))
+                hash_src = None
+                for key in group.keys:
+                    plan, hash_src = self._plan_table(key, source, group, columns, hash_src)
+                    plans.append(plan)
+        self._report(plans)
+        return plans
+
+    # --------------------------------------------------
+    def _plan_table(self, key: str, source: SQLServerSource, group,
+                    columns, hash_src) -> tuple[dict, pd.DataFrame | None]:
+        cfg = self.table_config[key]
+        src, dst, pk = cfg["source_table"], cfg["target_table"], cfg["primary_key"]
+        where = group.source_filter
+        exists = self.metadata.exists(dst)
+
+        if self.probe == "count":
+            n_src = source.count_rows(src, where)
+            n_dst = count_rows(self.pg_engine, dst, cfg.get("discriminator")) if exists else 0
+            new, changed, deleted = max(n_src - n_dst, 0), None, max(n_dst - n_src, 0)
+        else:
+            if hash_src is None:
+                hash_src = source.fetch_hashes(src, pk, columns, where)
+            hash_dst = (fetch_target_hashes(self.pg_engine, dst, pk, cfg.get("discriminator"))
+                        if exists else pd.DataFrame(columns=[pk, "hash_crc32"]))
+            diff = diff_hashes(hash_src, hash_dst, pk)
+            new, changed, deleted = (
+                len(diff.new_ids), len(diff.changed_ids), len(diff.deleted_ids)
+            )
+
+        to_load = new + (changed or 0)
+        est_bytes = est_seconds = None
+        throughput = self.history.throughput(key)
+        if throughput:
+            rows_per_sec, bytes_per_row = throughput
+            est_bytes, est_seconds = to_load * bytes_per_row, to_load / rows_per_sec
+
+        return {
+            "table": key, "target": dst, "exists": exists,
+            "new": new, "changed": changed, "deleted": deleted,
+            "to_load": to_load, "est_bytes": est_bytes, "est_seconds": est_seconds,
+        }, hash_src
+
+    # --------------------------------------------------
+    def _report(self, plans: list[dict]) -> None:
+        self.log.info("📋 Plan (%s):", self.probe)
+        self.log.info("   %-12s %10s %10s %10s %10s %10s",
+                      "tabla", "nuevas", "modif.", "borradas", "MB", "tiempo")
+        for p in plans:
+            self.log.info(
+                "   %-12s %10s %10s %10s %10s %10s",
+                p["table"], p["new"],
+                "n/d" if p["changed"] is None else p["changed"],
+                p["deleted"],
+                "n/d" if p["est_bytes"] is None else f"{p['est_bytes'] / 2**20:.1f}",
+                "n/d" if p["est_seconds"] is None else _fmt_seconds(p["est_seconds"]),
+            )
+        total_rows = sum(p["to_load"] for p in plans)
+        total_secs = sum(p["est_seconds"] or 0 for p in plans)
+        self.log.info("   Total a cargar: %s filas, ~%s.", total_rows, _fmt_seconds(total_secs))
+
+
+def _fmt_seconds(seconds: float) -> str:
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m" if h else f"{m}m{s:02d}s"
@@ -0,0 +1,65 @@
+# application/use_cases/run_daemon.py
+from __future__ import annotations
+import logging, threading
+from datetime import datetime
+
+
+class RunETLDaemonUseCase:
+    """
+    Proceso de larga duración: en cada tick ejecuta las tablas que tocan
+    según su planificación más las solicitadas bajo demanda.
+
+    Reutiliza la misma instancia de `IncrementalETLUseCase`, de modo que
+    pools de conexión, metadatos y planes de transformación siguen
+    calientes entre ciclos. Las tablas que tocan a la vez y comparten
+    origen se leen una sola vez (grupos de extracción). Un fallo en un
+    grupo no detiene el servicio.
+    """
+    def __init__(self, etl, scheduler, triggers, *, tick_seconds: int = 30) -> None:
+        self.etl = etl
+        self.scheduler = scheduler
+        self.triggers = triggers
+        self.tick = tick_seconds
+        self.stop_event = threading.Event()
+        self.log = logging.getLogger(__name__)
+
+    # --------------------------------------------------
+    def stop(self, *_args) -> None:
+        self.log.info("Parada solicitada; terminando tras la tabla en curso…")
+        self.stop_event.set()
+
+    # --------------------------------------------------
+    def execute(self, *, run_now: bool = False) -> None:
+        self.scheduler.start(datetime.now(), run_now=run_now)
+        self.log.info("🛰️ Servicio ETL iniciado (%s tablas, tick %ss).",
+                      len(self.scheduler.schedules), self.tick)
+        for key, sched in self.scheduler.schedules.items():
+            self.log.info("   %s: %r → próxima %s",
+                          key, sched, self.scheduler.next_run[key])
+
+        while not self.stop_event.is_set():
+            self._cycle()
+            self.stop_event.wait(self.tick)
+        self.log.info("🛑 Servicio ETL detenido.")
+
+    # --------------------------------------------------
+    def _cycle(self) -> None:
+        requested = self.triggers.pop_all()
+        pending = list(dict.fromkeys(requested + self.scheduler.due(datetime.now())))
+        if not pending:
+            return
+        # claves con el mismo origen (cve/hmo) → un solo escaneo del grupo
+        groups = self.etl.plan(pending)
+        planned = {key for group in groups for key in group.keys}
+        for key in pending:
+            if key not in planned:                  # sin config: nada que hacer
+                self.scheduler.mark_done(key, datetime.now())
+        for group in groups:
+            if self.stop_event.is_set():
+                return
+            try:
+                self.etl.run_group(group)
+            except Exception as exc:                 # pylint: disable=broad-except
+                self.log.error("🔥 Error en %s: %s", "+".join(group.keys), exc, exc_info=True)
+            for key in group.keys:
+                self.scheduler.mark_done(key, datetime.now())
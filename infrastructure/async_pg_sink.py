@@ -0,0 +1,182 @@
+# infrastructure/async_pg_sink.py
+"""
+Destino PostgreSQL asíncrono (asyncpg).
+
+Un event loop en un hilo propio mantiene un pool asyncpg; cada lote se
+carga con COPY binario a una tabla temporal y un INSERT … SELECT … ON
+CONFLICT al destino, todo en una transacción. `write()` solo encola el
+lote y vuelve: la extracción del siguiente chunk en el hilo principal se
+solapa con varios COPY/merge en vuelo (hasta `max_inflight`, con
+backpressure). `flush()` espera a los lotes de la tabla; `finish()` además
+pasa el mantenimiento.
+
+Los lotes que fallan no abortan los demás: quedan en `drain_failures()`
+para que ResilientSink los reintente/biseque por la vía síncrona
+(`write_sync`, el upsert de PostgresSink) antes de `finish()`.
+
+Requiere asyncpg (dependencia opcional, solo se importa aquí).
+"""
+from __future__ import annotations
+import asyncio, logging, threading
+import asyncpg
+import numpy as np
+import pandas as pd
+from sqlalchemy import DateTime, Float, Integer, String
+from infrastructure.pg_utils import key_columns
+from infrastructure.postgres_sink import PostgresSink
+
+logger = logging.getLogger(__name__)
+
+
+def _column_values(series: pd.Series, col_type) -> list:
+    """
+    asyncpg (COPY binario) es estricto con los tipos Python: adapta la
+    columna entera al tipo destino de una vez (sin una llamada por celda)
+    y devuelve valores Python con None para los nulos.
+    """
+    missing = series.isna().to_numpy()
+    if isinstance(col_type, Integer):
+        if series.dtype.kind not in "iu":
+            series = pd.to_numeric(series)                  # Decimal/texto → número
+            if series.dtype.kind == "f":
+                series = np.trunc(series)                   # como int(v)
+            series = series.astype("Int64")
+        values = series.astype(object).to_numpy()
+    elif isinstance(col_type, Float):
+        values = series.astype("float64").astype(object).to_numpy()
+    elif isinstance(col_type, DateTime) and pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = np.asarray(series.dt.to_pydatetime(), dtype=object)
+    elif isinstance(col_type, String):
+        values = series.astype(str).astype(object).to_numpy()
+    else:
+        values = series.astype(object).to_numpy()
+    if missing.any():
+        values = values.copy() if not values.flags.writeable else values
+        values[missing] = None
+    return values.tolist()
+
+
+class AsyncPgSink(PostgresSink):
+    name = "asyncpg"
+
+    def __init__(self, engine, dsn: str, metadata=None, *, pool_size: int = 4,
+                 max_inflight: int = 8, partition_workers: int = 1,
+                 maintenance=None) -> None:
+        super().__init__(engine, metadata, partition_workers=partition_workers,
+                         maintenance=maintenance)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="asyncpg-loader", daemon=True
+        )
+        self._thread.start()
+        self._pool = self._submit(
+            asyncpg.create_pool(dsn, min_size=1, max_size=pool_size)
+        ).result()
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._pending: dict[str, list] = {}
+        self._failures: list[tuple[str, dict, pd.DataFrame, BaseException]] = []
+        self._lock = threading.Lock()
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # --------------------------------------------------
+    def write_sync(self, key: str, cfg: dict, df: pd.DataFrame) -> None:
+        super().write(key, cfg, df)
+
+    # --------------------------------------------------
+    def write(self, key: str, cfg: dict, df: pd.DataFrame) -> None:
+        dst, pk = cfg["target_table"], cfg["primary_key"]
+        spec = self._spec(cfg)
+        df = self._tag(df, cfg)
+        if not self.metadata.exists(dst):
+            # el primer lote crea la tabla y va por la vía síncrona
+            self.write_sync(key, cfg, df)
+            return
+
+        part_keys = spec.keys_for(df) if spec is not None else None
+        if part_keys is not None:
+            # el merge va a la tabla padre: sin su partición las filas
+            # caerían en la DEFAULT (o fallarían en particiones por PK)
+            self.partitions.ensure(dst, spec, part_keys.drop_duplicates().tolist())
+
+        table = self.metadata.table(dst)
+        columns = [c for c in df.columns if c in table.c]
+        records = list(zip(*(_column_values(df[c], table.c[c].type) for c in columns)))
+        replace = spec is not None and not spec.has_primary_key
+
+        self._slots.acquire()                       # backpressure
+        keys = key_columns(pk, cfg.get("discriminator"))
+        fut = self._submit(self._copy_merge(dst, keys, columns, records, replace))
+        fut.add_done_callback(lambda f, k=key, c=cfg, d=df: self._done(f, k, c, d))
+        with self._lock:
+            self._pending.setdefault(dst, []).append(fut)
+
+    def _done(self, fut, key, cfg, df) -> None:
+        self._slots.release()
+        exc = fut.exception()
+        if exc is not None:
+            logger.warning("   Lote async de %s filas falló (%s); se reintentará.",
+                           len(df), exc.__class__.__name__)
+            with self._lock:
+                self._failures.append((key, cfg, df, exc))
+
+    # --------------------------------------------------
+    async def _copy_merge(self, dst, keys, columns, records, replace: bool) -> None:
+        tmp = "_etl_load"           # temporal de sesión: una carga por conexión
+        cols = ", ".join(f'"{c}"' for c in columns)
+        conflict = ", ".join(f'"{c}"' for c in keys)
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    f'CREATE TEMP TABLE "{tmp}" (LIKE "{dst}" INCLUDING DEFAULTS) '
+                    f"ON COMMIT DROP"
+                )
+                await conn.copy_records_to_table(tmp, records=records, columns=columns)
+                if replace:
+                    match = " AND ".join(f'd."{c}" = t."{c}"' for c in keys)
+                    await conn.execute(f'DELETE FROM "{dst}" d USING "{tmp}" t WHERE {match}')
+                    await conn.execute(
+                        f'INSERT INTO "{dst}" ({cols}) SELECT {cols} FROM "{tmp}"'
+                    )
+                else:
+                    updates = ", ".join(
+                        f'"{c}" = EXCLUDED."{c}"' for c in columns if c not in keys
+                    )
+                    await conn.execute(
+                        f'INSERT INTO "{dst}" ({cols}) SELECT {cols} FROM "{tmp}" '
+                        f"ON CONFLICT ({conflict}) DO UPDATE SET {updates}"
+                    )
+
+    # --------------------------------------------------
+    def flush(self, key: str, cfg: dict) -> None:
+        """Espera a los lotes en vuelo de la tabla (los fallidos, a `_failures`)."""
+        with self._lock:
+            pending = self._pending.pop(cfg["target_table"], [])
+        for fut in pending:
+            try:
+                fut.result()
+            except Exception:                       # pylint: disable=broad-except
+                pass                                # ya está en _failures
+
+    def finish(self, key: str, cfg: dict) -> None:
+        self.flush(key, cfg)
+        super().finish(key, cfg)
+
+    def drain_failures(self) -> list:
+        with self._lock:
+            failures, self._failures = self._failures, []
+        return failures
+
+    # --------------------------------------------------
+    def close(self) -> None:
+        for futs in list(self._pending.values()):
+            for fut in futs:
+                try:
+                    fut.result()
+                except Exception:                   # pylint: disable=broad-except
+                    pass
+        self._submit(self._pool.close()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        logger.debug("Loader asyncpg cerrado.")
@@ -0,0 +1,113 @@
+# infrastructure/chunk_cache.py
+"""
+Caché local de extracciones de SQL Server.
+
+Cada chunk extraído se guarda como fichero Arrow IPC (sin comprimir, para
+poder leerlo con memory-map) bajo una clave de contenido:
+
+    <root>/<tabla_origen>/<pk_min>-<pk_max>-<huella>.arrow
+
+La huella es un blake2b de los pares (pk, CHECKSUM) del chunk: si alguna
+fila cambia en origen, la clave cambia y la entrada vieja acaba expulsada.
+Reintentos, reconstrucciones del destino y sinks adicionales se sirven
+desde disco sin volver a consultar la BD de producción.
+
+La expulsión es LRU (por mtime, que se actualiza en cada acierto) bajo un
+tamaño máximo total. Requiere pyarrow.
+"""
+from __future__ import annotations
+import hashlib, logging, os, threading, numpy as np, pandas as pd
+from pathlib import Path
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkCache:
+    SUFFIX = ".arrow"
+
+    def __init__(self, root: str | os.PathLike, *, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: dict[Path, tuple[int, float]] = {}    # path → (bytes, mtime)
+        self.hits = self.misses = 0
+        if self.root.is_dir():
+            for path in self.root.rglob(f"*{self.SUFFIX}"):
+                st = path.stat()
+                self._index[path] = (st.st_size, st.st_mtime)
+
+    # --------------------------------------------------
+    @staticmethod
+    def fingerprint(ids, hashes) -> str:
+        pairs = np.column_stack([
+            np.asarray(ids, dtype=np.int64), np.asarray(hashes, dtype=np.int64)
+        ])
+        return hashlib.blake2b(np.ascontiguousarray(pairs).tobytes(), digest_size=16).hexdigest()
+
+    def path_for(self, table: str, ids, hashes) -> Path:
+        ids = np.asarray(ids, dtype=np.int64)
+        name = f"{ids.min()}-{ids.max()}-{self.fingerprint(ids, hashes)}{self.SUFFIX}"
+        return self.root / table / name
+
+    # --------------------------------------------------
+    def get(self, path: Path) -> pd.DataFrame | None:
+        with self._lock:
+            known = path in self._index
+        if not known:
+            self.misses += 1
+            return None
+        try:
+            with pa.memory_map(str(path), "r") as source:
+                df = pa.ipc.open_file(source).read_all().to_pandas()
+        except (OSError, pa.ArrowInvalid) as exc:
+            logger.warning("Entrada de caché ilegible %s (%s); se descarta.", path, exc)
+            self._drop(path)
+            self.misses += 1
+            return None
+        os.utime(path)
+        with self._lock:
+            self._index[path] = (self._index[path][0], path.stat().st_mtime)
+        self.hits += 1
+        return df
+
+    # --------------------------------------------------
+    def put(self, path: Path, df: pd.DataFrame) -> None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+            logger.warning("Chunk no cacheable (%s): %s", path.name, exc)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        st = path.stat()
+        with self._lock:
+            self._index[path] = (st.st_size, st.st_mtime)
+        self._evict()
+
+    # --------------------------------------------------
+    def _drop(self, path: Path) -> None:
+        with self._lock:
+            self._index.pop(path, None)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        with self._lock:
+            total = sum(size for size, _ in self._index.values())
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for path, (size, _) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+                if total <= self.max_bytes:
+                    break
+                victims.append(path)
+                total -= size
+        for path in victims:
+            self._drop(path)
+        logger.debug("Caché: %s entradas expulsadas (LRU).", len(victims))
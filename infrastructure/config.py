@@ -10,6 +10,9 @@ class Config:  # pylint: disable=too-few-public-methods
     SQL_DATABASE    = os.getenv("SQL_DATABASE", "TemporaryDB")
     SQL_DRIVER      = os.getenv("SQL_DRIVER", "ODBC Driver 17 for SQL Server")
     INTEGRATED_AUTH = True   # siempre auth integrada
+    # catálogo de varias bases (una por empresa), ver infrastructure/source_catalog.py
+    ETL_SOURCES_FILE = os.getenv("ETL_SOURCES_FILE", "sources.json")
+    ETL_SOURCES_PARALLEL = int(os.getenv("ETL_SOURCES_PARALLEL", "2"))    # orígenes a la vez
 
     # --- PostgreSQL ---
     PG_SERVER   = os.getenv("PG_SERVER", "localhost")
@@ -17,3 +20,54 @@ class Config:  # pylint: disable=too-few-public-methods
     PG_USER     = os.getenv("PG_USER", "postgres")
     PG_PASSWORD = os.getenv("PG_PASSWORD", "admin")
     PG_DATABASE = os.getenv("PG_DATABASE", "clone_sigrid")
+
+    # --- ETL ---
+    ETL_CHUNK        = int(os.getenv("ETL_CHUNK", "50000"))        # tamaño lote PKs
+    ETL_STATE_DIR    = os.getenv("ETL_STATE_DIR", ".etl_state")
+
+    # --- Pools (modo servicio) ---
+    SQL_POOL_SIZE = int(os.getenv("SQL_POOL_SIZE", "2"))
+    PG_POOL_SIZE  = int(os.getenv("PG_POOL_SIZE", "4"))
+    POOL_RECYCLE  = int(os.getenv("POOL_RECYCLE", "3600"))        # segundos
+
+    # --- Daemon ---
+    ETL_DEFAULT_SCHEDULE = os.getenv("ETL_DEFAULT_SCHEDULE", "0 2 * * *")  # nocturno
+    ETL_TICK_SECONDS     = int(os.getenv("ETL_TICK_SECONDS", "30"))
+
+    # --- Sink Parquet (opcional, requiere pyarrow) ---
+    PARQUET_DIR           = os.getenv("PARQUET_DIR", "parquet")
+    PARQUET_COMPACT_AFTER = int(os.getenv("PARQUET_COMPACT_AFTER", "20"))   # nº deltas
+
+    # --- Caché local de extracciones (opcional, requiere pyarrow) ---
+    ETL_CACHE       = os.getenv("ETL_CACHE", "0") == "1"
+    ETL_CACHE_DIR   = os.getenv("ETL_CACHE_DIR", os.path.join(ETL_STATE_DIR, "cache"))
+    ETL_CACHE_MAX_MB = int(os.getenv("ETL_CACHE_MAX_MB", "2048"))
+
+    # --- Reintentos / cuarentena ---
+    ETL_RETRIES          = int(os.getenv("ETL_RETRIES", "5"))
+    ETL_RETRY_BASE_DELAY = float(os.getenv("ETL_RETRY_BASE_DELAY", "1.0"))   # segundos
+    ETL_RETRY_MAX_DELAY  = float(os.getenv("ETL_RETRY_MAX_DELAY", "60"))
+    ETL_QUARANTINE_TABLE = os.getenv("ETL_QUARANTINE_TABLE", "etl_quarantine")
+    ETL_FK_PENDING_TABLE = os.getenv("ETL_FK_PENDING_TABLE", "etl_fk_pending")
+
+    # --- Particionado destino ---
+    PG_PARTITION_WORKERS = int(os.getenv("PG_PARTITION_WORKERS", "4"))
+
+    # --- Transformación en varios procesos (requiere pyarrow; 0/1 = desactivado) ---
+    ETL_TRANSFORM_WORKERS = int(os.getenv("ETL_TRANSFORM_WORKERS", "0"))
+
+    # --- Modo --profile (muestreo CPU + tracemalloc por tabla) ---
+    ETL_PROFILE_DIR            = os.getenv("ETL_PROFILE_DIR", os.path.join(ETL_STATE_DIR, "profiles"))
+    ETL_PROFILE_INTERVAL_MS    = float(os.getenv("ETL_PROFILE_INTERVAL_MS", "5"))
+    ETL_PROFILE_TOP            = int(os.getenv("ETL_PROFILE_TOP", "25"))
+    ETL_PROFILE_SNAPSHOT_EVERY = int(os.getenv("ETL_PROFILE_SNAPSHOT_EVERY", "0"))  # 0 = solo la 1ª llamada
+
+    # --- Mantenimiento destino (índice cubriente, fillfactor, ANALYZE) ---
+    PG_FILLFACTOR           = int(os.getenv("PG_FILLFACTOR", "90"))
+    PG_AUTOVACUUM_SCALE     = float(os.getenv("PG_AUTOVACUUM_SCALE", "0.05"))
+    PG_ANALYZE_FRACTION     = float(os.getenv("PG_ANALYZE_FRACTION", "0.1"))   # filas cambiadas / total
+    PG_ANALYZE_MIN_ROWS     = int(os.getenv("PG_ANALYZE_MIN_ROWS", "10000"))
+
+    # --- Loader asíncrono (opcional, requiere asyncpg) ---
+    PG_ASYNC_POOL_SIZE = int(os.getenv("PG_ASYNC_POOL_SIZE", "4"))
+    PG_ASYNC_INFLIGHT  = int(os.getenv("PG_ASYNC_INFLIGHT", "8"))     # lotes en vuelo
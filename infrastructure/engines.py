@@ -0,0 +1,71 @@
+# infrastructure/engines.py
+from __future__ import annotations
+import urllib.parse
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from infrastructure.config import Config
+
+
+def sql_server_url(config: type[Config], source=None) -> str:
+    """`source` (SourceDatabase del catálogo) cambia base y, si la trae, servidor."""
+    server = getattr(source, "server", None) or config.SQL_SERVER
+    database = source.database if source is not None else config.SQL_DATABASE
+    params = urllib.parse.quote_plus(
+        f"DRIVER={{{config.SQL_DRIVER}}};"
+        f"SERVER={server};"
+        f"DATABASE={database};"
+        "Trusted_Connection=yes;"
+    )
+    return f"mssql+pyodbc:///?odbc_connect={params}"
+
+
+def postgres_url(config: type[Config]) -> str:
+    return (
+        f"postgresql+psycopg2://{config.PG_USER}:{config.PG_PASSWORD}"
+        f"@{config.PG_SERVER}:{config.PG_PORT}/{config.PG_DATABASE}"
+    )
+
+
+def asyncpg_dsn(config: type[Config], schema: str | None = None) -> str:
+    # asyncpg pasa los parámetros desconocidos de la query como server_settings
+    return (
+        f"postgresql://{config.PG_USER}:{config.PG_PASSWORD}"
+        f"@{config.PG_SERVER}:{config.PG_PORT}/{config.PG_DATABASE}"
+        + (f"?search_path={schema}" if schema else "")
+    )
+
+
+# --------------------------------------------------------------------------- #
+def create_sql_engine(config: type[Config], *, pool_size: int | None = None,
+                      source=None) -> Engine:
+    """
+    Engine SQL Server con pool persistente: en modo servicio el login
+    ODBC (auth integrada) se paga una vez y no en cada ciclo.
+    Con `source` del catálogo y `max_connections`, el pool no crece más
+    allá de ese límite (sin overflow).
+    """
+    limit = getattr(source, "max_connections", None)
+    return create_engine(
+        sql_server_url(config, source),
+        pool_size=limit or pool_size or config.SQL_POOL_SIZE,
+        max_overflow=0 if limit else 10,
+        pool_pre_ping=True,
+        pool_recycle=config.POOL_RECYCLE,
+    )
+
+
+def create_pg_engine(config: type[Config], *, pool_size: int | None = None,
+                     schema: str | None = None) -> Engine:
+    """
+    Con `schema` todas las conexiones trabajan en ese esquema (search_path):
+    las tablas destino, particiones y la cuarentena se crean y leen allí.
+    """
+    connect_args = {"options": f"-csearch_path={schema}"} if schema else {}
+    return create_engine(
+        postgres_url(config),
+        future=True,
+        pool_size=pool_size or config.PG_POOL_SIZE,
+        pool_pre_ping=True,
+        pool_recycle=config.POOL_RECYCLE,
+        connect_args=connect_args,
+    )
@@ -0,0 +1,120 @@
+# infrastructure/fk_pending.py
+from __future__ import annotations
+import logging, threading
+import numpy as np, pandas as pd
+from sqlalchemy import (
+    MetaData, Table, Column, BigInteger, DateTime, String, delete, func, select, text,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+logger = logging.getLogger(__name__)
+
+
+class PgFkPending:
+    """
+    Filas cargadas con una FK colgante (corregida a placeholder o NULL):
+    tabla, PK, columna FK y la clave que faltaba en la tabla referenciada.
+
+    Las filas se guardan con su hash real, así que no se recargan en cada
+    run; cuando la tabla referenciada vuelve a cargarse, las que ya tienen
+    su clave se marcan para recarga (hash_crc32 NULL en destino).
+
+    Con `discriminator` (tablas compartidas entre orígenes) cada origen solo
+    ve y marca sus filas.
+    """
+    def __init__(self, engine, table_name: str = "etl_fk_pending",
+                 discriminator: dict | None = None) -> None:
+        self.engine = engine
+        self.discriminator = discriminator
+        self.source = discriminator["value"] if discriminator else ""
+        meta = MetaData()
+        self.table = Table(
+            table_name, meta,
+            Column("source", String, primary_key=True),
+            Column("target_table", String, primary_key=True),
+            Column("fk_column", String, primary_key=True),
+            Column("pk_value", BigInteger, primary_key=True),
+            Column("pk_column", String, nullable=False),
+            Column("ref_table", String, nullable=False),
+            Column("ref_column", String, nullable=False),
+            Column("missing_key", BigInteger, nullable=False),
+            Column("created_at", DateTime, server_default=func.now()),
+        )
+        self._meta = meta
+        self._ready = False
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    def _ensure(self) -> None:
+        with self._lock:
+            if not self._ready:
+                self._meta.create_all(self.engine, checkfirst=True)
+                self._ready = True
+
+    # --------------------------------------------------
+    def ref_tables(self) -> set[str]:
+        """Tablas referenciadas con filas pendientes de este origen."""
+        self._ensure()
+        t = self.table
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(t.c.ref_table).where(t.c.source == self.source).distinct()
+            )
+            return {r[0] for r in rows}
+
+    def record(self, target: str, pk_col: str, fk_col: str, ref_table: str,
+               ref_column: str, pks, missing) -> None:
+        self._ensure()
+        rows = [
+            {"source": self.source, "target_table": target, "fk_column": fk_col,
+             "pk_value": pk, "pk_column": pk_col, "ref_table": ref_table,
+             "ref_column": ref_column, "missing_key": key}
+            for pk, key in zip(np.asarray(pks, dtype=np.int64).tolist(),
+                               np.asarray(missing, dtype=np.int64).tolist())
+        ]
+        if not rows:
+            return
+        stmt = pg_insert(self.table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["source", "target_table", "fk_column", "pk_value"],
+            set_={c: stmt.excluded[c] for c in ("ref_table", "ref_column", "missing_key")},
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt, rows)
+
+    # --------------------------------------------------
+    def entries(self, ref_table: str) -> pd.DataFrame:
+        t = self.table
+        with self.engine.connect() as conn:
+            return pd.read_sql(
+                select(t.c.target_table, t.c.pk_column, t.c.fk_column, t.c.pk_value,
+                       t.c.ref_column, t.c.missing_key)
+                .where(t.c.source == self.source, t.c.ref_table == ref_table),
+                conn,
+            )
+
+    def resolve(self, resolved: pd.DataFrame) -> int:
+        """
+        Marca para recarga las filas de `resolved` (su FK ya existe) y las
+        quita de pendientes. Devuelve filas marcadas.
+        """
+        t = self.table
+        scope, params = "", {}
+        if self.discriminator:
+            scope = f' AND "{self.discriminator["column"]}" = :_src'
+            params = {"_src": self.source}
+        marked = 0
+        with self.engine.begin() as conn:
+            for (target, pk_col, fk_col), part in resolved.groupby(
+                    ["target_table", "pk_column", "fk_column"]):
+                ids = part["pk_value"].astype("int64").tolist()
+                marked += conn.execute(
+                    text(f'UPDATE "{target}" SET hash_crc32 = NULL '
+                         f'WHERE "{pk_col}" = ANY(:ids){scope}'),
+                    {"ids": ids, **params},
+                ).rowcount
+                conn.execute(delete(t).where(
+                    t.c.source == self.source, t.c.target_table == target,
+                    t.c.fk_column == fk_col, t.c.pk_value.in_(ids),
+                ))
+        return marked
@@ -0,0 +1,157 @@
+# infrastructure/parquet_sink.py
+"""
+Destino Parquet: un dataset por `target_table` con esta estructura
+
+    <root>/<target_table>/base/[year=YYYY/]*.parquet      ← snapshot compactado
+    <root>/<target_table>/delta/<run>/[year=YYYY/]*.parquet  ← cambios por run
+
+Cada run incremental escribe un directorio delta; `compact()` fusiona base
+y deltas (gana la última versión de cada PK) en una nueva base.
+
+Partición opcional por año de una columna fecha (tras rename):
+    TABLE_CONFIG[...]['parquet'] = {'partition_by_year': 'fecdoc'}
+
+Requiere pyarrow (dependencia opcional, solo se importa aquí).
+"""
+from __future__ import annotations
+import logging, os, shutil, threading
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+YEAR_COL = "year"
+
+
+class ParquetSink:
+    name = "parquet"
+
+    def __init__(
+        self,
+        root: str | os.PathLike,
+        *,
+        compact_after: int = 20,
+        row_group_size: int = 128_000,
+    ) -> None:
+        self.root = Path(root)
+        self.compact_after = compact_after
+        self.row_group_size = row_group_size
+        self._runs: dict[str, tuple[Path, int]] = {}     # target → (dir, nº chunk)
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    def _table_dir(self, cfg: dict) -> Path:
+        return self.root / cfg["target_table"]
+
+    def _parts(self, cfg: dict) -> list[Path]:
+        """
+        Directorios en orden de precedencia: base y luego deltas por run.
+        """
+        tdir = self._table_dir(cfg)
+        parts = [tdir / "base"] if (tdir / "base").is_dir() else []
+        if (tdir / "delta").is_dir():
+            parts += sorted(p for p in (tdir / "delta").iterdir() if p.is_dir())
+        return parts
+
+    @staticmethod
+    def _files(part: Path) -> list[Path]:
+        return sorted(part.rglob("*.parquet"))
+
+    # --------------------------------------------------
+    def _partition_col(self, cfg: dict) -> str | None:
+        return (cfg.get("parquet") or {}).get("partition_by_year")
+
+    def _to_arrow(self, cfg: dict, df: pd.DataFrame) -> pa.Table:
+        col = self._partition_col(cfg)
+        if col:
+            df = df.assign(**{YEAR_COL: pd.to_datetime(df[col], errors="coerce")
+                              .dt.year.astype("Int16")})
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def _write(self, cfg: dict, table: pa.Table, base_dir: Path, basename: str) -> None:
+        partitioning = None
+        if self._partition_col(cfg):
+            partitioning = ds.partitioning(
+                pa.schema([(YEAR_COL, pa.int16())]), flavor="hive"
+            )
+        ds.write_dataset(
+            table,
+            base_dir,
+            format="parquet",
+            partitioning=partitioning,
+            basename_template=basename + "-{i}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=ds.ParquetFileFormat().make_write_options(
+                use_dictionary=True,
+                write_statistics=True,
+                compression="zstd",
+            ),
+            max_rows_per_group=self.row_group_size,
+            min_rows_per_group=min(self.row_group_size, 16_384),
+        )
+
+    # --------------------------------------------------
+    def read_hashes(self, cfg: dict) -> pd.DataFrame:
+        pk = cfg["primary_key"]
+        frames = [
+            pq.read_table(f, columns=[pk, "hash_crc32"]).to_pandas()
+            for part in self._parts(cfg) for f in self._files(part)
+        ]
+        if not frames:
+            return pd.DataFrame(columns=[pk, "hash_crc32"])
+        return pd.concat(frames, ignore_index=True).drop_duplicates(pk, keep="last")
+
+    # --------------------------------------------------
+    def write(self, key: str, cfg: dict, df: pd.DataFrame) -> None:
+        dst = cfg["target_table"]
+        with self._lock:
+            run_dir, n = self._runs.get(dst) or (
+                self._table_dir(cfg) / "delta"
+                / datetime.now().strftime("%Y%m%dT%H%M%S%f"), 0
+            )
+            self._runs[dst] = (run_dir, n + 1)
+        self._write(cfg, self._to_arrow(cfg, df), run_dir, f"part-{n:06d}")
+
+    # --------------------------------------------------
+    def finish(self, key: str, cfg: dict) -> None:
+        with self._lock:
+            run = self._runs.pop(cfg["target_table"], None)
+        if run is None:
+            return
+        n_deltas = len(self._parts(cfg)) - (1 if (self._table_dir(cfg) / "base").is_dir() else 0)
+        logger.info("   Parquet %s: delta %s (%s chunks).", key, run[0].name, run[1])
+        if n_deltas >= self.compact_after:
+            self.compact(cfg)
+
+    # --------------------------------------------------
+    def compact(self, cfg: dict) -> None:
+        """
+        Fusiona base + deltas en una base nueva y borra los deltas.
+        El cambio de base es un rename, así que un lector nunca ve la
+        base a medio escribir.
+        """
+        pk, tdir = cfg["primary_key"], self._table_dir(cfg)
+        parts = self._parts(cfg)
+        if not parts:
+            return
+        logger.info("🗜️ Compactando Parquet %s (%s partes)…", cfg["target_table"], len(parts))
+
+        frames = [pq.read_table(f).to_pandas() for part in parts for f in self._files(part)]
+        df = pd.concat(frames, ignore_index=True).drop_duplicates(pk, keep="last")
+        df = df.drop(columns=[YEAR_COL], errors="ignore").sort_values(pk)
+
+        tmp, old = tdir / "base.tmp", tdir / "base.old"
+        shutil.rmtree(tmp, ignore_errors=True)
+        self._write(cfg, self._to_arrow(cfg, df), tmp, "part")
+        if (tdir / "base").is_dir():
+            (tdir / "base").rename(old)
+        tmp.rename(tdir / "base")
+        shutil.rmtree(old, ignore_errors=True)
+        for part in parts:
+            if part.parent.name == "delta":
+                shutil.rmtree(part, ignore_errors=True)
+        logger.info("   Base Parquet %s: %s filas.", cfg["target_table"], len(df))
@@ -0,0 +1,215 @@
+# infrastructure/pg_maintenance.py
+"""
+Mantenimiento de las tablas destino tras cada carga.
+
+- Índice cubriente ``(pk) INCLUDE (hash_crc32)``: la lectura de hashes de
+  cada ejecución (``SELECT pk, hash_crc32 … ORDER BY pk``) se resuelve con
+  un index-only scan en lugar de recorrer el heap. Sustituye al antiguo
+  índice solo sobre el hash, que no servía para esa lectura.
+- ``fillfactor`` y autovacuum más agresivo por tabla (en cada partición si
+  está particionada): deja hueco en cada página para las nuevas versiones
+  de fila y mantiene al día el visibility map que necesitan los
+  index-only scans.
+- ``ANALYZE`` solo cuando las filas modificadas desde el último
+  (``n_mod_since_analyze`` de ``pg_stat_user_tables``, sumando particiones)
+  superan ``analyze_fraction`` de la tabla (mínimo ``analyze_min_rows``).
+  El contador vive en PostgreSQL, así que acumula entre ejecuciones.
+
+En tablas que ya existen el índice cubriente se construye con ``CREATE
+INDEX CONCURRENTLY`` (partición a partición si está particionada) para no
+bloquear escrituras durante la construcción.
+
+Con ``maintenance: {'covering_index': False}`` en la config la tabla se
+queda solo con el índice de la PK: los UPDATE que cambian el hash pueden
+ser HOT (ninguna columna indexada cambia) a costa de leer los hashes con
+seq scan. Útil en tablas con mucha rotación y pocas filas.
+"""
+from __future__ import annotations
+import logging, threading
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+def covering_index_name(table: str) -> str:
+    return f"idx_{table}_pk_hash"
+
+
+class PgMaintenance:
+    def __init__(
+        self,
+        engine,
+        partitions=None,
+        *,
+        fillfactor: int = 90,
+        vacuum_scale_factor: float = 0.05,
+        analyze_fraction: float = 0.1,
+        analyze_min_rows: int = 10_000,
+    ) -> None:
+        self.engine = engine
+        self.partitions = partitions            # PartitionManager (opcional)
+        self.fillfactor = fillfactor
+        self.vacuum_scale_factor = vacuum_scale_factor
+        self.analyze_fraction = analyze_fraction
+        self.analyze_min_rows = analyze_min_rows
+        self._prepared: set[str] = set()
+        self._tuned: set[str] = set()
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    def _autocommit(self):
+        """CONCURRENTLY no puede ir dentro de una transacción."""
+        return self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+    @staticmethod
+    def _index_valid(conn, name: str) -> bool | None:
+        """True/False según `indisvalid`, None si el índice no existe."""
+        return conn.execute(
+            text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:i)"),
+            {"i": f'"{name}"'},
+        ).scalar()
+
+    def _build_concurrently(self, conn, name: str, table: str, cols: str) -> None:
+        """
+        CREATE INDEX CONCURRENTLY; si quedó uno inválido (build interrumpido)
+        se borra y se reconstruye.
+        """
+        state = self._index_valid(conn, name)
+        if state:
+            return
+        if state is False:
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+        logger.info("   🛠️ Creando índice %s (CONCURRENTLY)…", name)
+        conn.execute(text(
+            f'CREATE INDEX CONCURRENTLY "{name}" ON "{table}" ({cols}) INCLUDE (hash_crc32)'
+        ))
+
+    def ensure_indexes(self, table: str, key_cols: list[str], *, covering: bool = True,
+                       partitioned: bool = False) -> None:
+        """
+        Deja el índice cubriente (o lo quita con ``covering=False``) y borra
+        los índices antiguos sobre el hash / la PK que ya cubre.
+        `key_cols`: clave destino, (pk) o (origen, pk) en tablas compartidas.
+
+        Las tablas nuevas ya lo traen de create_table_with_pk; en las que ya
+        existían se construye sin bloquear escrituras. Una tabla particionada
+        no admite CONCURRENTLY: índice ``ON ONLY`` en la padre, uno
+        concurrente por partición y ``ATTACH PARTITION`` de cada uno.
+        """
+        name = covering_index_name(table)
+        cols = ", ".join(f'"{c}"' for c in key_cols)
+        old = [f"idx_{table}_hash"] + ([f"idx_{table}_pk"] if covering else [name])
+        with self._autocommit() as conn:
+            # varios orígenes pueden terminar a la vez la misma tabla
+            # compartida: lo construye quien consiga el lock (un lock que
+            # espera dentro de una consulta haría esperar a CONCURRENTLY)
+            if not conn.execute(text("SELECT pg_try_advisory_lock(hashtext(:t))"),
+                                {"t": f"etl_index:{table}"}).scalar():
+                logger.info("   %s: otro proceso está preparando sus índices.", table)
+                return
+            try:
+                self._ensure_indexes(conn, table, name, cols, old, covering, partitioned)
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(hashtext(:t))"),
+                             {"t": f"etl_index:{table}"})
+
+    def _ensure_indexes(self, conn, table: str, name: str, cols: str, old: list[str],
+                        covering: bool, partitioned: bool) -> None:
+        if covering and not self._index_valid(conn, name):
+            if not partitioned:
+                self._build_concurrently(conn, name, table, cols)
+            else:
+                conn.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS "{name}" ON ONLY "{table}" ({cols}) '
+                    f"INCLUDE (hash_crc32)"
+                ))
+                for leaf in self.partitions.partitions(table):
+                    leaf_name = covering_index_name(leaf)
+                    self._build_concurrently(conn, leaf_name, leaf, cols)
+                    attached = conn.execute(
+                        text("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:i)"),
+                        {"i": f'"{leaf_name}"'},
+                    ).first()
+                    if attached is None:
+                        conn.execute(text(f'ALTER INDEX "{name}" ATTACH PARTITION "{leaf_name}"'))
+        # DROP … CONCURRENTLY no vale para índices de tablas particionadas
+        concurrently = "" if partitioned else "CONCURRENTLY "
+        for idx in old:
+            conn.execute(text(f'DROP INDEX {concurrently}IF EXISTS "{idx}"'))
+
+    # --------------------------------------------------
+    def tune(self, table: str, fillfactor: int | None = None, *,
+             partitioned: bool = False) -> None:
+        """
+        fillfactor + umbrales de autovacuum en la tabla, o en cada partición
+        (los parámetros de almacenamiento no se admiten en la tabla padre).
+        """
+        leaves = [table]
+        if partitioned and self.partitions is not None:
+            leaves = self.partitions.partitions(table)
+        with self._lock:
+            pending = [t for t in leaves if t not in self._tuned]
+        if not pending:
+            return
+        params = (
+            f"fillfactor = {int(fillfactor or self.fillfactor)}, "
+            f"autovacuum_vacuum_scale_factor = {self.vacuum_scale_factor}, "
+            f"autovacuum_analyze_scale_factor = {self.vacuum_scale_factor}"
+        )
+        with self.engine.begin() as conn:
+            for leaf in pending:
+                conn.execute(text(f'ALTER TABLE "{leaf}" SET ({params})'))
+        with self._lock:
+            self._tuned.update(pending)
+
+    # --------------------------------------------------
+    def _modified_and_rows(self, table: str) -> tuple[int, int]:
+        """
+        (n_mod_since_analyze, reltuples) de la tabla, sumando sus
+        particiones si es padre.
+        """
+        with self.engine.connect() as conn:
+            changed, rows = conn.execute(
+                text(
+                    "SELECT COALESCE(SUM(s.n_mod_since_analyze), 0), "
+                    "       COALESCE(SUM(GREATEST(c.reltuples, 0)), 0) "
+                    "FROM pg_class c "
+                    "LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid "
+                    "WHERE c.oid = to_regclass(:t) OR c.oid IN ("
+                    "  SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:t))"
+                ),
+                {"t": f'"{table}"'},
+            ).one()
+        return int(changed or 0), int(rows or 0)
+
+    def analyze_if_needed(self, table: str, fraction: float | None = None) -> bool:
+        changed, rows = self._modified_and_rows(table)
+        if not changed:
+            return False
+        threshold = max(
+            self.analyze_min_rows,
+            (fraction if fraction is not None else self.analyze_fraction) * rows,
+        )
+        if changed < threshold:
+            return False
+        with self.engine.begin() as conn:
+            conn.execute(text(f'ANALYZE "{table}"'))
+        logger.info("   📊 ANALYZE %s (%s filas cambiadas).", table, changed)
+        return True
+
+    # --------------------------------------------------
+    def finish(self, cfg: dict, key_cols: list[str], *, partitioned: bool = False) -> None:
+        """
+        Paso de mantenimiento al terminar una tabla: índices y parámetros la
+        primera vez en este proceso (y particiones nuevas), ANALYZE si toca.
+        """
+        dst = cfg["target_table"]
+        opts = cfg.get("maintenance") or {}
+        with self._lock:
+            first = dst not in self._prepared
+            self._prepared.add(dst)
+        if first:
+            self.ensure_indexes(dst, key_cols, covering=opts.get("covering_index", True),
+                                partitioned=partitioned)
+        self.tune(dst, opts.get("fillfactor"), partitioned=partitioned)
+        self.analyze_if_needed(dst, opts.get("analyze_fraction"))
@@ -0,0 +1,54 @@
+# infrastructure/pg_metadata.py
+from __future__ import annotations
+import logging, threading
+from sqlalchemy import MetaData, Table, inspect
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class PgMetadataCache:
+    """
+    Cache de metadatos del destino: existencia de tablas y objetos `Table`
+    reflejados. Evita el `inspect`/`meta.reflect` por chunk y se mantiene
+    caliente entre ciclos del modo servicio.
+    """
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self._meta = MetaData()
+        self._tables: dict[str, Table] = {}
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    def exists(self, table_name: str) -> bool:
+        if table_name in self._tables:
+            return True
+        # inspector nuevo: el del engine cachea has_table indefinidamente
+        return inspect(self.engine).has_table(table_name)
+
+    # --------------------------------------------------
+    def table(self, table_name: str) -> Table:
+        """
+        Devuelve la `Table` reflejada (solo esa tabla, una vez).
+        """
+        with self._lock:
+            tbl = self._tables.get(table_name)
+            if tbl is None:
+                logger.debug("Reflejando tabla %s…", table_name)
+                tbl = Table(table_name, self._meta, autoload_with=self.engine)
+                self._tables[table_name] = tbl
+            return tbl
+
+    # --------------------------------------------------
+    def invalidate(self, table_name: str | None = None) -> None:
+        """
+        Olvida una tabla (o todas), p. ej. tras un DDL externo.
+        """
+        with self._lock:
+            if table_name is None:
+                self._tables.clear()
+                self._meta = MetaData()
+                return
+            tbl = self._tables.pop(table_name, None)
+            if tbl is not None:
+                self._meta.remove(tbl)
@@ -0,0 +1,144 @@
+# infrastructure/pg_partitions.py
+"""
+Particionado declarativo de tablas destino grandes.
+
+TABLE_CONFIG[...]['partitioning']:
+
+    {'method': 'range', 'interval': 1_000_000}          # rangos de PK
+    {'method': 'hash',  'modulus': 8}                    # hash de PK
+    {'method': 'range', 'column': 'fec', 'interval': 'year'}   # por año de fecha
+
+Por PK la clave primaria no cambia (la PK es la clave de partición) y el
+upsert ON CONFLICT sigue valiendo. Por fecha PostgreSQL no permite una
+PK que no incluya la columna de partición (y la fecha puede ser NULL), así
+que la tabla se crea sin PK, con índice por PK en cada partición, y la carga
+es DELETE + INSERT por lote. Las filas con fecha NULL van a la partición
+DEFAULT.
+
+Las particiones de rango se crean bajo demanda al cargar cada lote; las
+de hash, todas al crear la tabla.
+"""
+from __future__ import annotations
+import logging, threading, pandas as pd
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionSpec:
+    def __init__(self, spec: dict, pk: str) -> None:
+        self.method = spec.get("method", "range")
+        self.column = spec.get("column", pk)
+        self.by_pk = self.column == pk
+        if self.method not in ("range", "hash"):
+            raise ValueError(f"Método de partición desconocido: {self.method}")
+        if self.method == "hash" and not self.by_pk:
+            raise ValueError("El particionado hash solo se admite por PK.")
+        self.modulus = int(spec.get("modulus", 8))
+        self.interval = spec.get("interval", 1_000_000 if self.by_pk else "year")
+        if not self.by_pk and self.interval != "year":
+            raise ValueError("El particionado por fecha solo admite interval='year'.")
+
+    # --------------------------------------------------
+    @property
+    def has_primary_key(self) -> bool:
+        return self.by_pk
+
+    def partition_by(self) -> str:
+        return f'{self.method.upper()} ("{self.column}")'
+
+    # --------------------------------------------------
+    def keys_for(self, df: pd.DataFrame) -> pd.Series | None:
+        """
+        Clave de partición de cada fila (None para hash: enruta PostgreSQL).
+        """
+        if self.method == "hash":
+            return None
+        if self.by_pk:
+            return df[self.column] // int(self.interval)
+        return pd.to_datetime(df[self.column], errors="coerce").dt.year.astype("Int64")
+
+    def name(self, table: str, key) -> str:
+        if pd.isna(key):
+            return f"{table}_default"
+        return f"{table}_p{int(key)}" if self.by_pk else f"{table}_y{int(key)}"
+
+    def bounds(self, key) -> str:
+        if pd.isna(key):
+            return "DEFAULT"
+        key = int(key)
+        if self.by_pk:
+            step = int(self.interval)
+            return f"FOR VALUES FROM ({key * step}) TO ({(key + 1) * step})"
+        return f"FOR VALUES FROM ('{key}-01-01') TO ('{key + 1}-01-01')"
+
+
+# --------------------------------------------------------------------------- #
+class PartitionManager:
+    """
+    Crea particiones que falten (cacheando las conocidas) y lista las de
+    una tabla padre.
+    """
+    def __init__(self, engine) -> None:
+        self.engine = engine
+        self._known: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    def is_partitioned(self, table: str) -> bool:
+        with self.engine.connect() as conn:
+            kind = conn.execute(
+                text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"),
+                {"t": f'"{table}"'},
+            ).scalar()
+        return kind == "p"
+
+    # --------------------------------------------------
+    def partitions(self, table: str) -> list[str]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+                ),
+                {"t": f'"{table}"'},
+            )
+            names = [r[0] for r in rows]
+        with self._lock:
+            self._known[table] = set(names)
+        return names
+
+    # --------------------------------------------------
+    def create_initial(self, table: str, spec: PartitionSpec) -> None:
+        ddl = []
+        if spec.method == "hash":
+            ddl = [
+                f'CREATE TABLE IF NOT EXISTS "{table}_h{r}" PARTITION OF "{table}" '
+                f"FOR VALUES WITH (MODULUS {spec.modulus}, REMAINDER {r})"
+                for r in range(spec.modulus)
+            ]
+        elif not spec.by_pk:
+            ddl = [f'CREATE TABLE IF NOT EXISTS "{table}_default" PARTITION OF "{table}" DEFAULT']
+        with self.engine.begin() as conn:
+            for stmt in ddl:
+                conn.execute(text(stmt))
+        self.partitions(table)
+
+    # --------------------------------------------------
+    def ensure(self, table: str, spec: PartitionSpec, keys) -> None:
+        with self._lock:
+            known = self._known.get(table)
+        if known is None:
+            known = set(self.partitions(table))
+        missing = [(spec.name(table, k), k) for k in keys if spec.name(table, k) not in known]
+        if not missing:
+            return
+        with self._lock, self.engine.begin() as conn:
+            for name, key in missing:
+                conn.execute(text(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+                    f"{spec.bounds(key)}"
+                ))
+                self._known.setdefault(table, set()).add(name)
+                logger.info("   Partición %s creada (%s).", name, spec.bounds(key))
@@ -1,9 +1,10 @@
 # infrastructure/pg_utils.py
 from __future__ import annotations
 import logging, pandas as pd, numpy as np
-from sqlalchemy import MetaData, Table, Column, Integer, Float, DateTime, String, inspect
+from sqlalchemy import MetaData, Table, Column, Integer, Float, DateTime, String, inspect, text
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.engine import Engine
+from infrastructure.pg_maintenance import covering_index_name
 
 
 logger = logging.getLogger(__name__)
@@ -13,15 +14,97 @@ def table_exists(inspector, table_name: str) -> bool:
     return inspector.has_table(table_name)
 
 
+def ensure_schema(engine: Engine, schema: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+
+
+def _scope(discriminator: dict | None, glue: str = "WHERE") -> tuple[str, dict]:
+    """
+    Filtro por la columna discriminadora del origen (tablas compartidas
+    entre varias bases Sigrid, ver source_catalog): (sql, parámetros).
+    """
+    if not discriminator:
+        return "", {}
+    return f' {glue} "{discriminator["column"]}" = :_src', {"_src": discriminator["value"]}
+
+
 # --------------------------------------------------------------------------- #
-def create_table_with_pk(engine: Engine, table_name: str, df: pd.DataFrame, pk_col: str) -> None:
+def fetch_target_hashes(engine: Engine, table_name: str, pk_col: str,
+                        discriminator: dict | None = None) -> pd.DataFrame:
+    # ORDER BY pk: con el índice cubriente (pk) INCLUDE (hash_crc32) el
+    # planificador lo resuelve con un index-only scan sin tocar el heap
+    where, params = _scope(discriminator)
+    return pd.read_sql(
+        text(f'SELECT "{pk_col}", hash_crc32 FROM "{table_name}"{where} ORDER BY "{pk_col}"'),
+        engine, params=params,
+    )
+
+
+def count_rows(engine: Engine, table_name: str, discriminator: dict | None = None) -> int:
+    where, params = _scope(discriminator)
+    with engine.connect() as conn:
+        return conn.execute(
+            text(f'SELECT COUNT(*) FROM "{table_name}"{where}'), params
+        ).scalar_one()
+
+
+def fetch_key_array(engine: Engine, table_name: str, column: str,
+                    discriminator: dict | None = None) -> np.ndarray | None:
     """
-    Crea la tabla destino añadiendo columna hash_crc32 e índice.
+    Claves distintas de `column` como array int64, o None si la tabla no existe.
+    """
+    if not inspect(engine).has_table(table_name):
+        return None
+    scope, params = _scope(discriminator, "AND")
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(f'SELECT DISTINCT "{column}" FROM "{table_name}" '
+                 f'WHERE "{column}" IS NOT NULL{scope}'),
+            params,
+        )
+        return np.fromiter((r[0] for r in rows), dtype=np.int64)
+
+
+def ensure_placeholder_row(engine: Engine, table_name: str, pk_col: str, key: int,
+                           discriminator: dict | None = None) -> None:
+    """
+    Inserta (una vez) la fila placeholder con PK `key` y el resto a NULL.
+    """
+    scope, params = _scope(discriminator, "AND")
+    cols, values = f'"{pk_col}"', ":k"
+    if discriminator:
+        cols, values = f'"{discriminator["column"]}", {cols}', f":_src, {values}"
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text(f'SELECT 1 FROM "{table_name}" WHERE "{pk_col}" = :k{scope}'),
+            {"k": key, **params},
+        ).first()
+        if exists is None:
+            conn.execute(
+                text(f'INSERT INTO "{table_name}" ({cols}) VALUES ({values})'),
+                {"k": key, **params},
+            )
+            logger.info("Fila placeholder %s=%s insertada en %s.", pk_col, key, table_name)
+
+
+# --------------------------------------------------------------------------- #
+def create_table_with_pk(
+    engine: Engine, table_name: str, df: pd.DataFrame, pk_col: str, partitioning=None,
+    discriminator: dict | None = None,
+) -> None:
+    """
+    Crea la tabla destino añadiendo columna hash_crc32 y el índice cubriente
+    (pk) INCLUDE (hash_crc32) para leer los hashes con index-only scan.
+    Con `partitioning` (PartitionSpec) la crea como tabla particionada;
+    si la clave de partición no es la PK, sin PK (el índice cubriente hace
+    de índice por PK). Con `discriminator` la clave es (origen, pk).
     """
     from sqlalchemy import Index
 
     meta = MetaData()
     columns = []
+    key_cols = key_columns(pk_col, discriminator)
 
     for col, dtype in df.dtypes.items():
         if pd.api.types.is_integer_dtype(dtype):
@@ -33,42 +116,76 @@ def create_table_with_pk(engine: Engine, table_name: str, df: pd.DataFrame, pk_c
         else:
             col_type = String
 
-        kwargs = {"primary_key": True} if col == pk_col else {}
+        with_pk = col in key_cols and (partitioning is None or partitioning.has_primary_key)
+        kwargs = {"primary_key": True} if with_pk else {}
         columns.append(Column(col, col_type, **kwargs))
 
     # asegura la columna hash
     if "hash_crc32" not in df.columns:
         columns.append(Column("hash_crc32", Integer))
 
-    table = Table(table_name, meta, *columns)
-    meta.create_all(engine)
+    table_kw = {}
+    if partitioning is not None:
+        table_kw["postgresql_partition_by"] = partitioning.partition_by()
+    table = Table(table_name, meta, *columns, **table_kw)
 
-    # índice sobre hash para acelerar el WHERE en upsert
+    # varios orígenes pueden crear a la vez la misma tabla compartida:
+    # lock por nombre y creación + índice cubriente en la misma transacción
     with engine.begin() as conn:
-        idx = Index(f"idx_{table_name}_hash", table.c.hash_crc32)
-        idx.create(bind=conn)
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:t))"), {"t": table_name})
+        meta.create_all(conn)
+        Index(
+            covering_index_name(table_name),
+            *(table.c[c] for c in key_cols),
+            postgresql_include=["hash_crc32"],
+        ).create(bind=conn, checkfirst=True)
 
     logger.info("Tabla %s creada con PK '%s' y columna hash_crc32.", table_name, pk_col)
 
 
 # --------------------------------------------------------------------------- #
-def upsert_dataframe(engine, df, dst_table_name, pk_col):
+def key_columns(pk_col: str, discriminator: dict | None = None) -> list[str]:
+    """Columnas de la clave en destino: (discriminador, pk) o solo pk."""
+    return [discriminator["column"], pk_col] if discriminator else [pk_col]
+
+
+def upsert_dataframe(engine, df, dst_table_name, pk_col, table: Table | None = None,
+                     discriminator: dict | None = None):
     # 1. Conexión explícita (2.x ya no permite engine.execute)
     with engine.begin() as conn:
-        meta = MetaData()                # ← sin bind
-        meta.reflect(bind=conn)          # refleja el esquema que ya creaste
-
-        dst = Table(dst_table_name, meta, autoload_with=conn)
+        # `table` llega ya reflejada desde PgMetadataCache; si no, se
+        # refleja solo la tabla destino (no todo el esquema)
+        dst = table if table is not None else Table(
+            dst_table_name, MetaData(), autoload_with=conn
+        )
 
         # 2. Crea la sentencia INSERT ... ON CONFLICT
         stmt = pg_insert(dst).values(df.to_dict(orient="records"))
+        keys = key_columns(pk_col, discriminator)
         update_cols = {c.name: stmt.excluded[c.name]
-                       for c in dst.columns if c.name != pk_col}
+                       for c in dst.columns if c.name not in keys}
 
         stmt = stmt.on_conflict_do_update(
-            index_elements=[pk_col],
+            index_elements=keys,
             set_=update_cols
         )
 
         # 3. Ejecuta
         conn.execute(stmt)
+
+
+# --------------------------------------------------------------------------- #
+def replace_dataframe(engine, df, parent_table_name, pk_col, table: Table,
+                      discriminator: dict | None = None) -> None:
+    """
+    DELETE + INSERT del lote en una transacción, para tablas particionadas
+    por una columna distinta de la PK (sin ON CONFLICT posible: la fila
+    puede haber cambiado de partición).
+    """
+    scope, params = _scope(discriminator, "AND")
+    with engine.begin() as conn:
+        conn.execute(
+            text(f'DELETE FROM "{parent_table_name}" WHERE "{pk_col}" = ANY(:ids){scope}'),
+            {"ids": df[pk_col].astype("int64").tolist(), **params},
+        )
+        conn.execute(pg_insert(table).values(df.to_dict(orient="records")))
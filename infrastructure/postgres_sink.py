@@ -0,0 +1,160 @@
+# infrastructure/postgres_sink.py
+from __future__ import annotations
+import logging, pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from infrastructure.pg_maintenance import PgMaintenance
+from infrastructure.pg_metadata import PgMetadataCache
+from infrastructure.pg_partitions import PartitionManager, PartitionSpec
+from infrastructure.pg_utils import (
+    create_table_with_pk,
+    ensure_placeholder_row,
+    fetch_target_hashes,
+    key_columns,
+    replace_dataframe,
+    upsert_dataframe,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresSink:
+    """
+    Destino PostgreSQL: crea la tabla la primera vez y hace upsert por PK.
+
+    Con `partitioning` en la config la tabla se crea particionada y cada
+    lote se reparte por partición: upserts y lecturas de hashes van contra
+    cada partición (en paralelo hasta `partition_workers`).
+
+    Al terminar cada tabla pasa por `PgMaintenance` (índice cubriente,
+    fillfactor/autovacuum y ANALYZE según n_mod_since_analyze).
+
+    Con `discriminator` en la config (varias bases en tablas compartidas,
+    ver source_catalog) cada lote lleva la columna del origen, la clave es
+    (origen, pk) y los hashes se leen solo de ese origen.
+    """
+    name = "postgres"
+
+    def __init__(self, engine, metadata: PgMetadataCache | None = None,
+                 *, partition_workers: int = 1,
+                 maintenance: PgMaintenance | None = None) -> None:
+        self.engine = engine
+        self.metadata = metadata or PgMetadataCache(engine)
+        self.partitions = PartitionManager(engine)
+        self.maintenance = maintenance or PgMaintenance(engine, self.partitions)
+        if self.maintenance.partitions is None:
+            self.maintenance.partitions = self.partitions
+        self.partition_workers = partition_workers
+        self._specs: dict[str, PartitionSpec | None] = {}
+        self._placeholders: set[str] = set()
+
+    # --------------------------------------------------
+    def _spec(self, cfg: dict) -> PartitionSpec | None:
+        """
+        PartitionSpec efectiva: None si no se pidió o si la tabla ya existe
+        sin particionar (no se migra automáticamente).
+        """
+        dst = cfg["target_table"]
+        if dst in self._specs:
+            return self._specs[dst]
+        spec = None
+        if cfg.get("partitioning"):
+            spec = PartitionSpec(cfg["partitioning"], cfg["primary_key"])
+            if self.metadata.exists(dst) and not self.partitions.is_partitioned(dst):
+                logger.warning("%s ya existe sin particionar; se ignora 'partitioning' "
+                               "(recréala para particionarla).", dst)
+                spec = None
+        self._specs[dst] = spec
+        return spec
+
+    @staticmethod
+    def _tag(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
+        disc = cfg.get("discriminator")
+        if not disc:
+            return df
+        if disc["column"] in df.columns:        # lote ya etiquetado (reintento)
+            if not (df[disc["column"]] == disc["value"]).all():
+                raise ValueError(f"{cfg['target_table']}: la columna de origen "
+                                 f"'{disc['column']}' choca con el discriminador")
+            return df
+        df = df.copy(deep=False)
+        df.insert(0, disc["column"], disc["value"])
+        return df
+
+    def _map(self, fn, items) -> list:
+        if self.partition_workers > 1 and len(items) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.partition_workers, len(items))) as pool:
+                return list(pool.map(fn, items))
+        return [fn(item) for item in items]
+
+    # --------------------------------------------------
+    def read_hashes(self, cfg: dict) -> pd.DataFrame:
+        dst, pk = cfg["target_table"], cfg["primary_key"]
+        disc = cfg.get("discriminator")
+        if not self.metadata.exists(dst):
+            return pd.DataFrame(columns=[pk, "hash_crc32"])
+        if self._spec(cfg) is None:
+            return fetch_target_hashes(self.engine, dst, pk, disc)
+        parts = self.partitions.partitions(dst)
+        frames = self._map(lambda part: fetch_target_hashes(self.engine, part, pk, disc), parts)
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=[pk, "hash_crc32"])
+        return pd.concat(frames, ignore_index=True)
+
+    # --------------------------------------------------
+    def write(self, key: str, cfg: dict, df: pd.DataFrame) -> None:
+        dst, pk = cfg["target_table"], cfg["primary_key"]
+        disc = cfg.get("discriminator")
+        spec = self._spec(cfg)
+        df = self._tag(df, cfg)
+        # crear tabla si es la primera vez
+        if not self.metadata.exists(dst):
+            create_table_with_pk(self.engine, dst, df, pk, partitioning=spec,
+                                 discriminator=disc)
+            if spec is not None:
+                self.partitions.create_initial(dst, spec)
+
+        keys = spec.keys_for(df) if spec is not None else None
+        if keys is None:            # sin particiones o hash (enruta PostgreSQL)
+            upsert_dataframe(self.engine, df, dst, pk, table=self.metadata.table(dst),
+                             discriminator=disc)
+            return
+
+        groups = list(df.groupby(keys, dropna=False, sort=True))
+        self.partitions.ensure(dst, spec, [k for k, _ in groups])
+
+        def load(item):
+            part_key, part_df = item
+            part = self.metadata.table(spec.name(dst, part_key))
+            if spec.has_primary_key:
+                upsert_dataframe(self.engine, part_df, part.name, pk, table=part,
+                                 discriminator=disc)
+            else:
+                replace_dataframe(self.engine, part_df, dst, pk, table=part,
+                                  discriminator=disc)
+
+        self._map(load, groups)
+
+    # --------------------------------------------------
+    def ensure_placeholder(self, cfg: dict) -> None:
+        """
+        Fila placeholder (`add_placeholder_row`) si la tabla ya existe; una
+        vez por proceso y tabla, haya o no cambios en el run.
+        """
+        cleaning = cfg.get("data_cleaning") or {}
+        dst = cfg["target_table"]
+        if cleaning.get("add_placeholder_row") and dst not in self._placeholders \
+                and self.metadata.exists(dst):
+            ensure_placeholder_row(
+                self.engine, dst, cfg["primary_key"],
+                int(cleaning.get("placeholder_key", -1)), cfg.get("discriminator"),
+            )
+            self._placeholders.add(dst)
+
+    def finish(self, key: str, cfg: dict) -> None:
+        dst, pk = cfg["target_table"], cfg["primary_key"]
+        disc = cfg.get("discriminator")
+        self.ensure_placeholder(cfg)                # tabla recién creada
+        if self.metadata.exists(dst):
+            self.maintenance.finish(cfg, key_columns(pk, disc),
+                                    partitioned=self._spec(cfg) is not None)
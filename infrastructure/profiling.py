@@ -0,0 +1,191 @@
+# infrastructure/profiling.py
+"""
+Modo `--profile`: perfil de CPU por muestreo + asignaciones (tracemalloc)
+por tabla y etapa (hash, diff, extract, transform, load), sin
+herramientas externas.
+
+Por cada tabla (grupo de extracción) escribe en `out_dir`:
+
+    <tabla>.folded     pilas colapsadas "etapa;marco;marco… N" (flamegraph.pl,
+                       speedscope, inferno…), raíz primero
+    <tabla>.alloc.txt  por etapa: llamadas, segundos, pico y neto de memoria;
+                       y el top-N de líneas que más memoria retienen
+
+Tiempo, pico y neto se miden en cada llamada (`get_traced_memory`, barato).
+El reparto por línea necesita un par de `take_snapshot` + `compare_to`, que
+con un chunk grande vivo tarda decenas de segundos: solo se toma en la
+primera llamada de cada etapa por tabla y, con `snapshot_every=N`, en una
+de cada N llamadas más.
+
+El muestreo lee `sys._current_frames()` desde un hilo propio cada
+`interval` segundos y solo mira el hilo que ejecuta la tabla: lo que
+corre en otros hilos (particiones en paralelo, loader asyncpg) o en el
+pool de transformación aparece como espera en la etapa correspondiente.
+tracemalloc es global del proceso: con `--profile` el ETL va tabla a
+tabla para que las cifras sean atribuibles.
+"""
+from __future__ import annotations
+import logging, os, re, sys, threading, time, tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# fuera del informe: el propio perfilador, tracemalloc e importlib
+_NOISE = [
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+]
+
+
+class _TableStats:
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self.stacks: Counter[str] = Counter()
+        self.stages: dict[str, dict] = {}
+        self.alloc: Counter = Counter()              # (etapa, fichero:línea) → bytes
+        self.snapshots: Counter[str] = Counter()     # etapa → pares de snapshots
+
+
+class TableProfiler:
+    def __init__(self, out_dir: str | os.PathLike, *, interval: float = 0.005,
+                 top_n: int = 25, nframes: int = 10, snapshot_every: int = 0) -> None:
+        self.out_dir = Path(out_dir)
+        self.interval = interval
+        self.top_n = top_n
+        self.snapshot_every = snapshot_every
+        self.nframes = nframes
+        self._active: dict[int, tuple[_TableStats, str]] = {}   # hilo → (tabla, etapa)
+        self._lock = threading.Lock()
+        self._sampler: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._own_tracemalloc = False
+
+    # ───── Muestreo ─────────────────────────────────────────────────────────
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()                  # pylint: disable=protected-access
+            with self._lock:
+                active = list(self._active.items())
+            for tid, (stats, stage) in active:
+                frame = frames.get(tid)
+                if frame is None or tid == me:
+                    continue
+                names = []
+                while frame is not None:
+                    names.append(self._frame_name(frame))
+                    frame = frame.f_back
+                stats.stacks[";".join([stage] + names[::-1])] += 1
+
+    def _ensure_running(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframes)
+            self._own_tracemalloc = True
+        if self._sampler is None or not self._sampler.is_alive():
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop,
+                                             name="etl-profiler", daemon=True)
+            self._sampler.start()
+
+    # ───── API ──────────────────────────────────────────────────────────────
+    @contextmanager
+    def table(self, label: str):
+        """Perfila todo lo que ejecute este hilo hasta salir del bloque."""
+        stats = _TableStats(label)
+        tid = threading.get_ident()
+        with self._lock:
+            self._ensure_running()
+            self._active[tid] = (stats, "other")
+        try:
+            yield stats
+        finally:
+            with self._lock:
+                self._active.pop(tid, None)
+            self._write(stats)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Etapa dentro de la tabla en curso de este hilo: tiempo y pico/neto
+        de memoria traceada; en las llamadas muestreadas, además, diff de
+        snapshots (neto por línea). Fuera de `table()` no hace nada.
+        """
+        tid = threading.get_ident()
+        with self._lock:
+            current = self._active.get(tid)
+            if current is not None:
+                self._active[tid] = (current[0], name)
+        if current is None:
+            yield
+            return
+        stats, previous = current
+        agg = stats.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "peak": 0, "net": 0})
+        call = agg["calls"]
+        sampled = call == 0 or (self.snapshot_every > 0 and call % self.snapshot_every == 0)
+        before = tracemalloc.take_snapshot().filter_traces(_NOISE) if sampled else None
+        mem_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            mem_end, peak = tracemalloc.get_traced_memory()
+            if sampled:
+                after = tracemalloc.take_snapshot().filter_traces(_NOISE)
+                for diff in after.compare_to(before, "lineno"):
+                    if diff.size_diff > 0:
+                        frame = diff.traceback[0]
+                        stats.alloc[(name, f"{frame.filename}:{frame.lineno}")] += diff.size_diff
+                stats.snapshots[name] += 1
+            agg["calls"] += 1
+            agg["seconds"] += seconds
+            agg["peak"] = max(agg["peak"], peak - mem_start)
+            agg["net"] += mem_end - mem_start
+            with self._lock:
+                if tid in self._active:
+                    self._active[tid] = (stats, previous)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+            self._own_tracemalloc = False
+
+    # ───── Informes ─────────────────────────────────────────────────────────
+    def _write(self, stats: _TableStats) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        safe = re.sub(r"[^\w.+-]", "_", stats.label)
+
+        folded = self.out_dir / f"{safe}.folded"
+        with folded.open("w", encoding="utf-8") as fh:
+            for stack, count in stats.stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+
+        mb = 2**20
+        lines = [f"Perfil de {stats.label}", "",
+                 f"{'etapa':<10} {'llamadas':>8} {'segundos':>10} {'pico MB':>10} {'neto MB':>10}"]
+        for name, agg in stats.stages.items():
+            lines.append(f"{name:<10} {agg['calls']:>8} {agg['seconds']:>10.3f} "
+                         f"{agg['peak'] / mb:>10.1f} {agg['net'] / mb:>10.1f}")
+        sampled = ", ".join(f"{n} {k}" for k, n in stats.snapshots.items())
+        lines += ["", f"Top {self.top_n} líneas por memoria asignada y retenida al final "
+                      f"de cada etapa (suma de las llamadas muestreadas: {sampled}):", ""]
+        for (stage, where), size in stats.alloc.most_common(self.top_n):
+            lines.append(f"{size / mb:>10.2f} MB  {stage:<10} {where}")
+        alloc = self.out_dir / f"{safe}.alloc.txt"
+        alloc.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        samples = sum(stats.stacks.values())
+        logger.info("   🔬 Perfil %s: %s muestras → %s, %s", stats.label, samples,
+                    folded.name, alloc.name)
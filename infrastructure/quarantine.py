@@ -0,0 +1,108 @@
+# infrastructure/quarantine.py
+from __future__ import annotations
+import json, logging, threading
+import pandas as pd
+from sqlalchemy import (
+    MetaData, Table, Column, BigInteger, DateTime, String, Text, func, insert, inspect,
+    select, text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+logger = logging.getLogger(__name__)
+
+
+class PgQuarantine:
+    """
+    Tabla de cuarentena en PostgreSQL para filas que no se pudieron cargar:
+    clave ETL, sink, PK, hash de origen, error y la fila completa en JSONB.
+
+    Con `discriminator` (tablas compartidas entre orígenes) cada fila lleva
+    el origen y cada origen solo consulta las suyas.
+    """
+    def __init__(self, engine, table_name: str = "etl_quarantine",
+                 discriminator: dict | None = None) -> None:
+        self.engine = engine
+        self.source = discriminator["value"] if discriminator else ""
+        meta = MetaData()
+        self.table = Table(
+            table_name, meta,
+            Column("id", BigInteger, primary_key=True, autoincrement=True),
+            Column("table_key", String, nullable=False),
+            Column("target_table", String, nullable=False),
+            Column("sink", String, nullable=False),
+            Column("pk_value", String),
+            Column("source", String),
+            Column("source_hash", BigInteger),
+            Column("error", Text),
+            Column("row_data", JSONB),
+            Column("created_at", DateTime, server_default=func.now()),
+        )
+        self._meta = meta
+        self._ready = False
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    def _ensure(self) -> None:
+        with self._lock:
+            if not self._ready:
+                self._meta.create_all(self.engine, checkfirst=True)
+                name = self.table.name
+                with self.engine.begin() as conn:
+                    # tablas de cuarentena creadas antes de estas columnas
+                    conn.execute(text(
+                        f'ALTER TABLE "{name}" ADD COLUMN IF NOT EXISTS source VARCHAR, '
+                        f"ADD COLUMN IF NOT EXISTS source_hash BIGINT"
+                    ))
+                    conn.execute(text(
+                        f'CREATE INDEX IF NOT EXISTS "idx_{name}_key" '
+                        f'ON "{name}" (table_key, sink, source)'
+                    ))
+                self._ready = True
+
+    # --------------------------------------------------
+    def record(self, key: str, cfg: dict, sink: str, df, exc: BaseException) -> None:
+        self._ensure()
+        pk = cfg["primary_key"]
+        clean = df.astype(object).where(df.notna(), None)    # NaN/NaT → null
+        rows = [
+            {
+                "table_key": key,
+                "target_table": cfg["target_table"],
+                "sink": sink,
+                "pk_value": str(rec.get(pk)),
+                "source": self.source,
+                "source_hash": None if rec.get("hash_crc32") is None
+                else int(rec["hash_crc32"]),
+                "error": f"{exc.__class__.__name__}: {exc}"[:4000],
+                # default=str: fechas, Decimal, bytes… sin perder la fila
+                "row_data": json.loads(json.dumps(rec, default=str)),
+            }
+            for rec in clean.to_dict(orient="records")
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(insert(self.table), rows)
+        logger.warning("🚧 %s fila(s) de %s a cuarentena (%s): %s",
+                       len(rows), key, sink, exc.__class__.__name__)
+
+    # --------------------------------------------------
+    def hashes(self, key: str, sink: str) -> pd.DataFrame:
+        """
+        (pk, hash_crc32) de origen de las filas en cuarentena de `key`/`sink`:
+        si el origen no ha cambiado, no merece la pena volver a cargarlas.
+        Solo lee: sin tabla de cuarentena (p. ej. en dry-run) no hay nada.
+        """
+        if not self._ready and not inspect(self.engine).has_table(self.table.name):
+            return pd.DataFrame({"pk_value": pd.Series(dtype="float64"),
+                                 "hash_crc32": pd.Series(dtype="int64")})
+        self._ensure()
+        t = self.table
+        with self.engine.connect() as conn:
+            df = pd.read_sql(
+                select(t.c.pk_value, t.c.source_hash.label("hash_crc32")).where(
+                    t.c.table_key == key, t.c.sink == sink, t.c.source == self.source,
+                    t.c.source_hash.is_not(None),
+                ),
+                conn,
+            )
+        df["pk_value"] = pd.to_numeric(df["pk_value"], errors="coerce")
+        return df.dropna(subset=["pk_value"])
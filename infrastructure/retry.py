@@ -0,0 +1,101 @@
+# infrastructure/retry.py
+from __future__ import annotations
+import logging, random, time
+from sqlalchemy import exc as sa_exc
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE de errores transitorios (PostgreSQL y SQL Server/ODBC)
+TRANSIENT_SQLSTATES = {
+    "40001",            # serialization failure / deadlock victim (ODBC)
+    "40P01",            # deadlock_detected
+    "55P03",            # lock_not_available
+    "57P01", "57P02", "57P03",      # admin/crash shutdown, cannot connect now
+    "08000", "08001", "08003", "08004", "08006", "08S01",   # conexión
+    "HYT00", "HYT01",   # timeouts ODBC
+}
+# números de error nativos de SQL Server
+TRANSIENT_MSSQL_ERRORS = {1205, 1222, 4060, 40197, 40501, 40613, 49918, 49919, 49920}
+
+
+def _sqlstate(orig) -> str | None:
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    if code:
+        return code
+    args = getattr(orig, "args", ())
+    if args and isinstance(args[0], str) and len(args[0]) == 5:
+        return args[0]          # pyodbc: ('40001', '[40001] ... (1205) ...')
+    return None
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Deadlocks, timeouts de bloqueo y conexiones perdidas: merece la pena
+    reintentar el mismo lote tal cual.
+    """
+    if isinstance(exc, sa_exc.DBAPIError):
+        if exc.connection_invalidated:
+            return True
+        if _sqlstate(exc.orig) in TRANSIENT_SQLSTATES:
+            return True
+        text = str(exc.orig)
+        return any(f"({n})" in text for n in TRANSIENT_MSSQL_ERRORS)
+    # drivers nativos sin SQLAlchemy (asyncpg expone `sqlstate`)
+    if getattr(exc, "sqlstate", None) in TRANSIENT_SQLSTATES:
+        return True
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def is_data_error(exc: BaseException) -> bool:
+    """
+    Errores atribuibles a filas concretas (overflow, encoding, NOT NULL…):
+    reintentar no sirve, pero partir el lote sí.
+
+    Solo cuentan los que vienen del driver/BD; un TypeError o ValueError
+    genérico es un fallo de código y se propaga (bisecarlo mandaría la
+    tabla entera a cuarentena).
+    """
+    if isinstance(exc, (sa_exc.DataError, sa_exc.IntegrityError)):
+        return True
+    if isinstance(exc, sa_exc.DBAPIError):
+        return (_sqlstate(exc.orig) or "")[:2] in ("22", "23")
+    # clase 22 (data exception) / 23 (integrity) en drivers nativos
+    if (getattr(exc, "sqlstate", None) or "")[:2] in ("22", "23"):
+        return True
+    return isinstance(exc, (OverflowError, UnicodeError))
+
+
+def error_signature(exc: BaseException) -> tuple[str, str | None]:
+    """(clase, SQLSTATE) del error: mismo valor = mismo fallo de fondo."""
+    orig = getattr(exc, "orig", None) or exc
+    return exc.__class__.__name__, _sqlstate(orig) or getattr(exc, "sqlstate", None)
+
+
+# --------------------------------------------------------------------------- #
+def call_with_retry(
+    fn,
+    *args,
+    attempts: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    on_retry=None,
+    **kwargs,
+):
+    """
+    Ejecuta `fn` reintentando errores transitorios con backoff exponencial
+    y jitter. Cualquier otro error se propaga en el primer intento.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as exc:                     # pylint: disable=broad-except
+            if attempt == attempts or not is_transient(exc):
+                raise
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+            delay *= random.uniform(0.5, 1.0)
+            logger.warning("⚠️ Error transitorio (%s/%s): %s – reintento en %.1fs",
+                           attempt, attempts, exc.__class__.__name__, delay)
+            if on_retry is not None:
+                on_retry()
+            time.sleep(delay)
+    raise AssertionError("unreachable")
@@ -0,0 +1,62 @@
+# infrastructure/run_history.py
+from __future__ import annotations
+import json, logging, threading
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class RunHistory:
+    """
+    Histórico de cargas por tabla (JSON Lines en ETL_STATE_DIR): filas,
+    bytes y segundos de cada ejecución. Alimenta las estimaciones del plan.
+    """
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    def record(self, table: str, *, rows: int, nbytes: int, seconds: float) -> None:
+        entry = {
+            "table": table,
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "rows": rows,
+            "bytes": nbytes,
+            "seconds": round(seconds, 3),
+        }
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry) + "\n")
+
+    # --------------------------------------------------
+    def entries(self, table: str | None = None) -> list[dict]:
+        if not self.path.exists():
+            return []
+        out = []
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if table is None or entry.get("table") == table:
+                    out.append(entry)
+        return out
+
+    # --------------------------------------------------
+    def throughput(self, table: str, last: int = 10) -> tuple[float, float] | None:
+        """
+        (filas/seg, bytes/fila) de las últimas `last` cargas con filas de
+        la tabla; si no hay, las de todas las tablas. None sin histórico.
+        """
+        for scope in (table, None):
+            runs = [e for e in self.entries(scope) if e.get("rows") and e.get("seconds")]
+            runs = runs[-last:] if scope else runs
+            if runs:
+                rows = sum(e["rows"] for e in runs)
+                secs = sum(e["seconds"] for e in runs)
+                nbytes = sum(e.get("bytes", 0) for e in runs)
+                return rows / secs, nbytes / rows
+        return None
@@ -0,0 +1,145 @@
+# infrastructure/source_catalog.py
+"""
+Catálogo de bases de datos Sigrid de origen (una por empresa).
+
+Sin catálogo el ETL usa la única base de `Config.SQL_DATABASE`, como
+siempre. Con `Config.ETL_SOURCES_FILE` (JSON) se replican N bases en el
+mismo run:
+
+    {
+      "mode": "schema",              ← "schema" | "shared"
+      "discriminator": "empresa",    ← columna de origen en modo "shared"
+      "sources": [
+        {"name": "emp01", "database": "SIGRID_EMP01", "max_connections": 2},
+        {"name": "emp02", "database": "SIGRID_EMP02",
+         "server": "OTRO\\\\INST", "schema": "sigrid_emp02"}
+      ]
+    }
+
+- mode "schema": cada origen carga en su propio esquema de PostgreSQL
+  (`schema`, por defecto `name`), con las mismas tablas destino.
+- mode "shared": todos cargan en las mismas tablas con la columna
+  `discriminator` = `name`, que forma parte de la clave (PK compuesta).
+
+`max_connections` limita el pool SQL Server de ese origen (y las tablas
+en paralelo dentro de él).
+"""
+from __future__ import annotations
+import json, re
+from pathlib import Path
+from infrastructure.config import Config
+
+MODES = ("schema", "shared")
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class SourceDatabase:
+    def __init__(
+        self,
+        name: str,
+        database: str,
+        *,
+        server: str | None = None,
+        schema: str | None = None,
+        max_connections: int | None = None,
+    ) -> None:
+        self.name = name
+        self.database = database
+        self.server = server
+        self.schema = schema
+        self.max_connections = max_connections
+
+    def __repr__(self) -> str:
+        return f"SourceDatabase({self.name!r}, {self.database!r})"
+
+
+class SourceCatalog:
+    """
+    Orígenes a replicar y cómo se separan en destino (`mode`).
+    `single` indica el modo clásico de una sola base sin catálogo.
+    """
+    def __init__(self, sources: list[SourceDatabase], *, mode: str = "schema",
+                 discriminator: str = "empresa", single: bool = False) -> None:
+        self.sources = sources
+        self.mode = mode
+        self.discriminator = discriminator
+        self.single = single
+
+    # --------------------------------------------------
+    def get(self, name: str) -> SourceDatabase:
+        for src in self.sources:
+            if src.name == name:
+                return src
+        raise KeyError(f"Origen '{name}' no está en el catálogo")
+
+    def select(self, names: list[str] | None) -> list[SourceDatabase]:
+        return [self.get(n) for n in names] if names else list(self.sources)
+
+    # --------------------------------------------------
+    @classmethod
+    def default(cls, config: type[Config] = Config) -> "SourceCatalog":
+        return cls([SourceDatabase("default", config.SQL_DATABASE)], single=True)
+
+    @classmethod
+    def load(cls, config: type[Config] = Config) -> "SourceCatalog":
+        """
+        Catálogo de `ETL_SOURCES_FILE` si existe; si no, la base única.
+        """
+        path = Path(config.ETL_SOURCES_FILE) if config.ETL_SOURCES_FILE else None
+        if path is None or not path.exists():
+            return cls.default(config)
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        catalog = cls(
+            [
+                SourceDatabase(
+                    s["name"], s["database"],
+                    server=s.get("server"),
+                    schema=s.get("schema"),
+                    max_connections=s.get("max_connections"),
+                )
+                for s in raw.get("sources", [])
+            ],
+            mode=raw.get("mode", "schema"),
+            discriminator=raw.get("discriminator", "empresa"),
+        )
+        errors = catalog.validate()
+        if errors:
+            raise ValueError(f"{path}: " + "; ".join(errors))
+        return catalog
+
+    # --------------------------------------------------
+    def validate(self) -> list[str]:
+        errors = []
+        if self.mode not in MODES:
+            errors.append(f"mode '{self.mode}' desconocido (schema|shared)")
+        if not self.sources:
+            errors.append("sin orígenes")
+        names = [s.name for s in self.sources]
+        if len(set(names)) != len(names):
+            errors.append("nombres de origen repetidos")
+        for src in self.sources:
+            schema = src.schema or src.name
+            if self.mode == "schema" and not _IDENT.match(schema):
+                errors.append(f"{src.name}: esquema '{schema}' no es un identificador válido")
+            if src.max_connections is not None and src.max_connections < 1:
+                errors.append(f"{src.name}: max_connections debe ser >= 1")
+        if self.mode == "shared" and not _IDENT.match(self.discriminator):
+            errors.append(f"discriminator '{self.discriminator}' no es un identificador válido")
+        return errors
+
+    # --------------------------------------------------
+    def target_schema(self, source: SourceDatabase) -> str | None:
+        if self.single or self.mode != "schema":
+            return None
+        return source.schema or source.name
+
+    def source_config(self, source: SourceDatabase, table_config: dict) -> dict:
+        """
+        TABLE_CONFIG efectivo para `source`: en modo "shared" cada config
+        lleva `discriminator` {'column', 'value'}, que los sinks usan para
+        filtrar hashes/claves y como parte de la clave en destino.
+        """
+        if self.single or self.mode != "shared":
+            return table_config
+        disc = {"column": self.discriminator, "value": source.name}
+        return {key: {**cfg, "discriminator": disc} for key, cfg in table_config.items()}
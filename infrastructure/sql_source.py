@@ -0,0 +1,116 @@
+# infrastructure/sql_source.py
+from __future__ import annotations
+import logging, pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+# tipos que CHECKSUM no admite como argumento (error 8116); CHECKSUM(*) los
+# ignora, así que en la lista proyectada también se omiten
+NON_COMPARABLE_TYPES = {"text", "ntext", "image", "xml", "geography", "geometry"}
+
+
+class SQLServerSource:
+    """
+    Lecturas sobre la BD Sigrid: hashes por PK y filas por lote de PKs.
+
+    `columns=None` equivale a `SELECT *` / `CHECKSUM(*)`; con una lista se
+    proyectan esas columnas y el CHECKSUM se calcula solo sobre ellas
+    (salvo text/ntext/image/xml…, que se leen pero no entran en el hash,
+    igual que con `CHECKSUM(*)`).
+    `where` es un predicado SQL que se empuja a todas las consultas.
+    """
+    def __init__(self, conn: Connection, schema_cache: dict | None = None) -> None:
+        self.conn = conn
+        self.schema_cache = schema_cache if schema_cache is not None else {}
+
+    # --------------------------------------------------
+    def reset(self) -> None:
+        """
+        Deja la conexión usable tras un error (SQLAlchemy reconecta en el
+        siguiente uso si fue invalidada).
+        """
+        try:
+            self.conn.rollback()
+        except Exception:                            # pylint: disable=broad-except
+            logger.debug("rollback tras error falló", exc_info=True)
+
+    # --------------------------------------------------
+    def column_types(self, src: str) -> dict[str, str]:
+        """
+        {columna: DATA_TYPE} de la tabla origen en orden ordinal (cacheado).
+        """
+        types = self.schema_cache.get(src)
+        if types is None:
+            rows = self.conn.execute(
+                text(
+                    "SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS "
+                    "WHERE TABLE_NAME = :t ORDER BY ORDINAL_POSITION"
+                ),
+                {"t": src},
+            )
+            types = self.schema_cache[src] = {r[0]: r[1].lower() for r in rows}
+        return types
+
+    def columns(self, src: str) -> list[str]:
+        """
+        Columnas de la tabla origen en orden ordinal (cacheadas).
+        """
+        return list(self.column_types(src))
+
+    # --------------------------------------------------
+    def _select(self, src: str, columns: list[str] | None) -> tuple[str, str]:
+        if columns is None:
+            return "*", "CHECKSUM(*)"
+        types = self.column_types(src)
+        hashed = [c for c in columns if types.get(c) not in NON_COMPARABLE_TYPES]
+        return (", ".join(f"[{c}]" for c in columns),
+                f"CHECKSUM({', '.join(f'[{c}]' for c in hashed)})")
+
+    @staticmethod
+    def _pk_predicate(pk: str, ids) -> str:
+        """
+        `pk BETWEEN a AND b` para rangos consecutivos (≥ 3 claves) y un
+        `IN (...)` con el resto: SQL mucho más corto con PKs autoincrementales.
+        """
+        if not hasattr(ids, "ranges"):
+            return f"{pk} IN ({','.join(map(str, ids))})"
+        starts, ends = ids.ranges()
+        long_run = (ends - starts) >= 2
+        parts = [f"{pk} BETWEEN {a} AND {b}"
+                 for a, b in zip(starts[long_run].tolist(), ends[long_run].tolist())]
+        singles = [str(v) for a, b in zip(starts[~long_run].tolist(), ends[~long_run].tolist())
+                   for v in range(a, b + 1)]
+        if singles:
+            parts.append(f"{pk} IN ({','.join(singles)})")
+        return "(" + " OR ".join(parts) + ")" if len(parts) > 1 else parts[0]
+
+    @staticmethod
+    def _and(where: str | None) -> str:
+        return f" AND ({where})" if where else ""
+
+    # --------------------------------------------------
+    def fetch_hashes(self, src: str, pk: str, columns=None, where=None) -> pd.DataFrame:
+        _, checksum = self._select(src, columns)
+        return pd.read_sql(
+            f"SELECT {pk}, CAST({checksum} AS bigint) AS hash_crc32 FROM {src}"
+            + (f" WHERE {where}" if where else ""),
+            self.conn,
+        )
+
+    # --------------------------------------------------
+    def count_rows(self, src: str, where=None) -> int:
+        return int(pd.read_sql(
+            f"SELECT COUNT_BIG(*) AS n FROM {src}" + (f" WHERE {where}" if where else ""),
+            self.conn,
+        )["n"].iloc[0])
+
+    # --------------------------------------------------
+    def fetch_rows(self, src: str, pk: str, ids, columns=None, where=None) -> pd.DataFrame:
+        select, checksum = self._select(src, columns)
+        return pd.read_sql(
+            f"SELECT {select}, CAST({checksum} AS bigint) AS hash_crc32 "
+            f"FROM {src} WHERE {self._pk_predicate(pk, ids)}" + self._and(where),
+            self.conn,
+        )
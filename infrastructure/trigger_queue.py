@@ -0,0 +1,38 @@
+# infrastructure/trigger_queue.py
+from __future__ import annotations
+import logging, os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class FileTriggerQueue:
+    """
+    Cola mínima basada en ficheros para pedir al daemon que ejecute una
+    tabla fuera de su horario: un fichero `<tabla>.trigger` por petición.
+    """
+    SUFFIX = ".trigger"
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self.dir = Path(directory)
+
+    # --------------------------------------------------
+    def push(self, table: str) -> Path:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self.dir / f"{table}{self.SUFFIX}"
+        path.touch()
+        logger.info("Ejecución de '%s' solicitada (%s).", table, path)
+        return path
+
+    # --------------------------------------------------
+    def pop_all(self) -> list[str]:
+        if not self.dir.is_dir():
+            return []
+        tables = []
+        for path in sorted(self.dir.glob(f"*{self.SUFFIX}")):
+            try:
+                path.unlink()
+            except FileNotFoundError:      # otro proceso ya la consumió
+                continue
+            tables.append(path.name[: -len(self.SUFFIX)])
+        return tables
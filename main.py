@@ -1,114 +1,487 @@
 # main.py
+"""
+CLI del ETL incremental Sigrid → PostgreSQL.
+
+    python main.py run [TABLAS|PATRONES…] [--chunk N] [--parallel N] [--dry-run]
+                       [--sink postgres|asyncpg|parquet …] [--cache]
+                       [--transform-workers N] [--profile]
+    python main.py plan [TABLAS|PATRONES…] [--quick] [--fail-above N]
+    python main.py daemon [TABLAS…] [--run-now]
+    python main.py trigger TABLA…
+    python main.py check
+    python main.py validate
+    python main.py compact [TABLAS|PATRONES…]
+
+run/plan/daemon/compact admiten `--source NOMBRE` (repetible) cuando hay
+catálogo de varias bases (Config.ETL_SOURCES_FILE); run/daemon además
+`--sources-parallel N`.
+
+Los módulos pesados (pandas, SQLAlchemy, pyodbc, psycopg2) se importan
+dentro de cada comando: `--help`, `validate` y `trigger` no los cargan.
+"""
 from __future__ import annotations
-import logging, sys, urllib, pandas as pd
-from sqlalchemy import create_engine, text, inspect
-from application.table_config import TABLE_CONFIG
-from infrastructure.config import Config
-from infrastructure.pg_utils import (
-    table_exists,
-    create_table_with_pk,
-    upsert_dataframe,
-)
-
-# ───── logging ──────────────────────────────────────────────────────────────
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s  [%(levelname)s]  %(name)s: %(message)s",
-)
+import argparse, fnmatch, logging, sys
+
 log = logging.getLogger("etl_incremental")
 
 # ───── Tablas a procesar ────────────────────────────────────────────────────
 TABLES: list[str] = ["auxhor"]        #   ← pon [] para todas
-if not TABLES:
-    TABLES = list(TABLE_CONFIG.keys())
-log.info("Tablas a procesar: %s", TABLES)
-
-# ───── Conexiones ───────────────────────────────────────────────────────────
-sql_params = urllib.parse.quote_plus(
-    f"DRIVER={{{Config.SQL_DRIVER}}};"
-    f"SERVER={Config.SQL_SERVER};"
-    f"DATABASE={Config.SQL_DATABASE};"
-    "Trusted_Connection=yes;"
-)
-sql_url = f"mssql+pyodbc:///?odbc_connect={sql_params}"
-pg_url = (
-    f"postgresql+psycopg2://{Config.PG_USER}:{Config.PG_PASSWORD}"
-    f"@{Config.PG_SERVER}:{Config.PG_PORT}/{Config.PG_DATABASE}"
-)
-pg_engine = create_engine(pg_url, future=True)
-pg_inspector = inspect(pg_engine)
-
-CHUNK = 50_000  # <-- tamaño lote PKs
-
-# ───── Transformaciones básicas ────────────────────────────────────────────
-def transform_df(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
-    if cfg.get("rename_columns"):
-        df = df.rename(columns=cfg["rename_columns"])
-    for col in cfg.get("date_columns", []):
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", format="%Y%m%d")
-    return df
-
-
-# ───── ETL incremental por tabla ────────────────────────────────────────────
-try:
-    with create_engine(sql_url).connect() as sql_conn:
-        for key in TABLES:
-            cfg = TABLE_CONFIG.get(key)
-            if not cfg:
-                log.warning("No config para %s – omitida.", key)
-                continue
-
-            src, dst, pk = cfg["source_table"], cfg["target_table"], cfg["primary_key"]
-            log.info("▶ Tabla %s (origen %s → destino %s)", key, src, dst)
-
-            # --- obtener hashes origen ----------------
-            hash_src = pd.read_sql(
-                f"SELECT {pk}, CAST(CHECKSUM(*) AS bigint) AS hash_crc32 FROM {src}",
-                sql_conn,
-            )
 
-            # --- hashes destino ------------------------
-            if table_exists(pg_inspector, dst):
-                hash_dst = pd.read_sql(
-                    text(f'SELECT "{pk}", hash_crc32 FROM "{dst}"'), pg_engine
-                )
-            else:
-                hash_dst = pd.DataFrame(columns=[pk, "hash_crc32"])
 
-            merged = hash_src.merge(
-                hash_dst, on=pk, how="left", suffixes=("_src", "_dst")
+def select_tables(patterns: list[str], table_config: dict) -> list[str]:
+    """
+    Resuelve nombres o patrones glob (`dca*`, `Dim*`) contra la clave de
+    TABLE_CONFIG o su `target_table`. Mantiene el orden de TABLE_CONFIG.
+    """
+    if not patterns:
+        return TABLES or list(table_config)
+    selected: list[str] = []
+    for pattern in patterns:
+        matches = [
+            key for key, cfg in table_config.items()
+            if fnmatch.fnmatchcase(key, pattern)
+            or fnmatch.fnmatchcase(cfg.get("target_table", ""), pattern)
+        ]
+        if not matches:
+            raise SystemExit(f"Ninguna tabla coincide con '{pattern}'.")
+        selected.extend(m for m in matches if m not in selected)
+    return selected
+
+
+# ───── Comandos ─────────────────────────────────────────────────────────────
+def _catalog(args):
+    from infrastructure.source_catalog import SourceCatalog
+
+    catalog = SourceCatalog.load()
+    names = getattr(args, "source", None)
+    if names:
+        try:
+            catalog.sources = catalog.select(names)
+        except KeyError as exc:
+            raise SystemExit(str(exc)) from exc
+    return catalog
+
+
+def _state_dir(source=None):
+    """Estado (histórico, caché, Parquet) separado por origen si hay catálogo."""
+    from pathlib import Path
+    from infrastructure.config import Config
+
+    root = Path(Config.ETL_STATE_DIR)
+    return root if source is None else root / "sources" / source
+
+
+def _history(source: str | None = None):
+    from infrastructure.run_history import RunHistory
+
+    return RunHistory(_state_dir(source) / "runs.jsonl")
+
+
+def _parquet_sink(source: str | None = None):
+    from pathlib import Path
+    from infrastructure.config import Config
+    from infrastructure.parquet_sink import ParquetSink
+
+    root = Path(Config.PARQUET_DIR) if source is None else Path(Config.PARQUET_DIR) / source
+    return ParquetSink(root, compact_after=Config.PARQUET_COMPACT_AFTER)
+
+
+def _chunk_cache(source: str | None = None):
+    from pathlib import Path
+    from infrastructure.chunk_cache import ChunkCache
+    from infrastructure.config import Config
+
+    root = Path(Config.ETL_CACHE_DIR) if source is None else Path(Config.ETL_CACHE_DIR) / source
+    return ChunkCache(root, max_bytes=Config.ETL_CACHE_MAX_MB * 2**20)
+
+
+def _build_etl(args):
+    """
+    IncrementalETLUseCase para la base única o, con catálogo de orígenes,
+    MultiSourceETLUseCase con uno por base (mismo pool de transformación).
+    """
+    from infrastructure.config import Config
+
+    catalog = _catalog(args)
+    transforms = _transform_pool(args)
+    profile_dir = _profile_dir(args)
+    if catalog.single:
+        return _build_source_etl(args, catalog, catalog.sources[0], transforms, profile_dir)
+
+    from application.use_cases.multi_source_etl import MultiSourceETLUseCase
+
+    log.info("Orígenes (%s): %s", catalog.mode, [s.name for s in catalog.sources])
+    return MultiSourceETLUseCase(
+        {s.name: _build_source_etl(args, catalog, s, transforms, profile_dir)
+         for s in catalog.sources},
+        parallel_sources=getattr(args, "sources_parallel", None) or Config.ETL_SOURCES_PARALLEL,
+        limits={s.name: s.max_connections for s in catalog.sources},
+    )
+
+
+def _build_source_etl(args, catalog, source, transforms, profile_dir=None):
+    from functools import partial
+    from application.fk_validation import ForeignKeyValidator
+    from application.resilient_sink import ResilientSink
+    from application.table_config import TABLE_CONFIG
+    from application.use_cases.incremental_etl import IncrementalETLUseCase
+    from infrastructure.config import Config
+    from infrastructure.engines import create_pg_engine, create_sql_engine
+    from infrastructure.fk_pending import PgFkPending
+    from infrastructure.pg_maintenance import PgMaintenance
+    from infrastructure.pg_metadata import PgMetadataCache
+    from infrastructure.pg_utils import ensure_placeholder_row, ensure_schema, fetch_key_array
+    from infrastructure.postgres_sink import PostgresSink
+    from infrastructure.quarantine import PgQuarantine
+
+    name = None if catalog.single else source.name
+    schema = catalog.target_schema(source)
+    table_config = catalog.source_config(source, TABLE_CONFIG)
+    disc = None if catalog.single or catalog.mode != "shared" else \
+        {"column": catalog.discriminator, "value": source.name}
+
+    parallel = getattr(args, "parallel", 1)
+    if source.max_connections:
+        parallel = min(parallel, source.max_connections)
+    pg_engine = create_pg_engine(
+        Config, pool_size=max(parallel * Config.PG_PARTITION_WORKERS, Config.PG_POOL_SIZE),
+        schema=schema,
+    )
+    # en dry-run no se crea nada: sin esquema todas las tablas cuentan como nuevas
+    if schema and not getattr(args, "dry_run", False):
+        ensure_schema(pg_engine, schema)
+    metadata = PgMetadataCache(pg_engine)
+
+    retry = {
+        "attempts": Config.ETL_RETRIES,
+        "base_delay": Config.ETL_RETRY_BASE_DELAY,
+        "max_delay": Config.ETL_RETRY_MAX_DELAY,
+    }
+    quarantine = PgQuarantine(pg_engine, Config.ETL_QUARANTINE_TABLE, discriminator=disc)
+    maintenance = PgMaintenance(
+        pg_engine,
+        fillfactor=Config.PG_FILLFACTOR,
+        vacuum_scale_factor=Config.PG_AUTOVACUUM_SCALE,
+        analyze_fraction=Config.PG_ANALYZE_FRACTION,
+        analyze_min_rows=Config.PG_ANALYZE_MIN_ROWS,
+    )
+
+    sinks = []
+    for sink_name in getattr(args, "sink", None) or ["postgres"]:
+        if sink_name == "postgres":
+            sink = PostgresSink(pg_engine, metadata,
+                                partition_workers=Config.PG_PARTITION_WORKERS,
+                                maintenance=maintenance)
+        elif sink_name == "asyncpg":
+            from infrastructure.async_pg_sink import AsyncPgSink
+            from infrastructure.engines import asyncpg_dsn
+
+            sink = AsyncPgSink(
+                pg_engine, asyncpg_dsn(Config, schema), metadata,
+                pool_size=Config.PG_ASYNC_POOL_SIZE,
+                max_inflight=Config.PG_ASYNC_INFLIGHT,
+                partition_workers=Config.PG_PARTITION_WORKERS,
+                maintenance=maintenance,
             )
-            ids_to_load = merged.loc[
-                merged["hash_crc32_dst"].isna()
-                | (merged["hash_crc32_src"] != merged["hash_crc32_dst"])
-            ][pk].tolist()
-
-            if not ids_to_load:
-                log.info("   Sin cambios.")
-                continue
-
-            log.info("   %s filas nuevas/modificadas.", len(ids_to_load))
-
-            # --- procesar en chunks --------------------
-            for i in range(0, len(ids_to_load), CHUNK):
-                chunk_ids = ids_to_load[i : i + CHUNK]
-                id_list_sql = ",".join(map(str, chunk_ids))
-
-                df = pd.read_sql(
-                    f"SELECT *, CAST(CHECKSUM(*) AS bigint) AS hash_crc32 "
-                    f"FROM {src} WHERE {pk} IN ({id_list_sql})",
-                    sql_conn,
-                )
-                df = transform_df(df, cfg)
-
-                # crear tabla si es la primera vez
-                if not table_exists(pg_inspector, dst):
-                    create_table_with_pk(pg_engine, dst, df, pk)
-
-                upsert_dataframe(pg_engine, df, dst, pk)
-
-        log.info("🏁 ETL incremental finalizado OK.")
-except Exception as exc:                             # pylint: disable=broad-except
-    log.error("🔥 Error en ETL: %s", exc, exc_info=True)
-    sys.exit(1)
+        else:
+            sink = _parquet_sink(name)
+        sinks.append(ResilientSink(sink, quarantine, **retry))
+
+    use_cache = getattr(args, "cache", None)
+    if use_cache is None:
+        use_cache = Config.ETL_CACHE
+
+    fk_validator = ForeignKeyValidator(
+        partial(fetch_key_array, pg_engine, discriminator=disc),
+        partial(ensure_placeholder_row, pg_engine, discriminator=disc),
+        PgFkPending(pg_engine, Config.ETL_FK_PENDING_TABLE, discriminator=disc),
+    )
+
+    return IncrementalETLUseCase(
+        sql_engine=create_sql_engine(
+            Config, pool_size=max(parallel, Config.SQL_POOL_SIZE), source=source,
+        ),
+        pg_engine=pg_engine,
+        table_config=table_config,
+        chunk=args.chunk or Config.ETL_CHUNK,
+        metadata=metadata,
+        dry_run=getattr(args, "dry_run", False),
+        history=_history(name),
+        sinks=sinks,
+        cache=_chunk_cache(name) if use_cache else None,
+        retry=retry,
+        fk_validator=fk_validator,
+        transforms=transforms,
+        name=name,
+        profiler=_profiler(profile_dir, name),
+    )
+
+
+def _profile_dir(args):
+    """Directorio de informes de este run con `--profile` (si no, None)."""
+    if not getattr(args, "profile", False):
+        return None
+    from datetime import datetime
+    from pathlib import Path
+    from infrastructure.config import Config
+
+    return Path(Config.ETL_PROFILE_DIR) / datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+def _profiler(profile_dir, source: str | None = None):
+    if profile_dir is None:
+        return None
+    from infrastructure.config import Config
+    from infrastructure.profiling import TableProfiler
+
+    return TableProfiler(
+        profile_dir if source is None else profile_dir / source,
+        interval=Config.ETL_PROFILE_INTERVAL_MS / 1000,
+        top_n=Config.ETL_PROFILE_TOP,
+        snapshot_every=Config.ETL_PROFILE_SNAPSHOT_EVERY,
+    )
+
+
+def _transform_pool(args):
+    from infrastructure.config import Config
+
+    workers = getattr(args, "transform_workers", None)
+    if workers is None:
+        workers = Config.ETL_TRANSFORM_WORKERS
+    if workers <= 1:
+        return None
+    from application.transform_pool import TransformPool
+
+    return TransformPool(workers)
+
+
+def cmd_run(args) -> int:
+    from application.table_config import TABLE_CONFIG
+
+    tables = select_tables(args.tables, TABLE_CONFIG)
+    log.info("Tablas a procesar: %s", tables)
+    if args.profile and (args.parallel > 1 or (args.sources_parallel or 0) > 1):
+        log.info("🔬 --profile: tablas y orígenes de uno en uno (tracemalloc es global).")
+    if args.profile:
+        args.parallel, args.sources_parallel = 1, 1
+    etl = None
+    try:
+        etl = _build_etl(args)
+        etl.execute(tables, parallel=args.parallel)
+    except Exception as exc:                             # pylint: disable=broad-except
+        log.error("🔥 Error en ETL: %s", exc, exc_info=True)
+        return 1
+    finally:
+        if etl is not None:
+            etl.close()
+    return 0
+
+
+def cmd_plan(args) -> int:
+    from application.table_config import TABLE_CONFIG
+    from application.use_cases.plan_etl import PlanETLUseCase
+    from infrastructure.config import Config
+    from infrastructure.engines import create_pg_engine, create_sql_engine
+
+    tables = select_tables(args.tables, TABLE_CONFIG)
+    catalog = _catalog(args)
+    plans = []
+    try:
+        for source in catalog.sources:
+            name = None if catalog.single else source.name
+            if name:
+                log.info("🏢 Origen %s (%s):", name, source.database)
+            plans += PlanETLUseCase(
+                sql_engine=create_sql_engine(Config, source=source),
+                pg_engine=create_pg_engine(Config, schema=catalog.target_schema(source)),
+                history=_history(name),
+                table_config=catalog.source_config(source, TABLE_CONFIG),
+                probe="count" if args.quick else "diff",
+            ).execute(tables)
+    except Exception as exc:                             # pylint: disable=broad-except
+        log.error("🔥 Error en plan: %s", exc, exc_info=True)
+        return 1
+
+    runaway = [p["table"] for p in plans
+               if args.fail_above is not None and p["to_load"] > args.fail_above]
+    if runaway:
+        log.error("❌ Diff por encima de %s filas en: %s", args.fail_above, runaway)
+        return 2
+    return 0
+
+
+def cmd_daemon(args) -> int:
+    import signal
+    from pathlib import Path
+    from application.table_config import TABLE_CONFIG
+    from application.scheduler import TableScheduler
+    from application.use_cases.run_daemon import RunETLDaemonUseCase
+    from infrastructure.config import Config
+    from infrastructure.trigger_queue import FileTriggerQueue
+
+    tables = select_tables(args.tables, TABLE_CONFIG) if args.tables else list(TABLE_CONFIG)
+    scheduler = TableScheduler(TABLE_CONFIG, tables, Config.ETL_DEFAULT_SCHEDULE)
+    etl = _build_etl(args)
+    daemon = RunETLDaemonUseCase(
+        etl,
+        scheduler,
+        FileTriggerQueue(Path(Config.ETL_STATE_DIR) / "triggers"),
+        tick_seconds=Config.ETL_TICK_SECONDS,
+    )
+    signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        daemon.execute(run_now=args.run_now)
+    except KeyboardInterrupt:
+        daemon.stop()
+    finally:
+        etl.close()
+    return 0
+
+
+def cmd_trigger(args) -> int:
+    from pathlib import Path
+    from application.table_config import TABLE_CONFIG
+    from infrastructure.config import Config
+    from infrastructure.trigger_queue import FileTriggerQueue
+
+    triggers = FileTriggerQueue(Path(Config.ETL_STATE_DIR) / "triggers")
+    for key in select_tables(args.tables, TABLE_CONFIG):
+        triggers.push(key)
+    return 0
+
+
+def cmd_check(args) -> int:
+    from application.use_cases.ensure_postgres_db import EnsurePostgresDatabaseUseCase
+    from application.use_cases.test_sql_connection import TestSQLConnectionUseCase
+    from infrastructure.config import Config
+    from infrastructure.pg_gateway import PostgresAdminGateway
+    from infrastructure.sql_gateway import SQLServerGateway
+
+    try:
+        TestSQLConnectionUseCase(SQLServerGateway(config=Config)).execute()
+        EnsurePostgresDatabaseUseCase(PostgresAdminGateway(config=Config)).execute()
+    except Exception as exc:                             # pylint: disable=broad-except
+        log.error("🔥 Check fallido: %s", exc, exc_info=args.verbose)
+        return 1
+    return 0
+
+
+def cmd_compact(args) -> int:
+    from application.table_config import TABLE_CONFIG
+
+    catalog = _catalog(args)
+    for source in catalog.sources:
+        sink = _parquet_sink(None if catalog.single else source.name)
+        for key in select_tables(args.tables, TABLE_CONFIG):
+            sink.compact(TABLE_CONFIG[key])
+    return 0
+
+
+def cmd_validate(args) -> int:
+    from application.config_validation import validate_table_config
+    from application.table_config import TABLE_CONFIG
+
+    errors = validate_table_config(TABLE_CONFIG)
+    for err in errors:
+        log.error("❌ %s", err)
+    if errors:
+        return 1
+    log.info("✅ TABLE_CONFIG OK (%s tablas).", len(TABLE_CONFIG))
+
+    from infrastructure.source_catalog import SourceCatalog
+
+    try:
+        catalog = SourceCatalog.load()
+    except (ValueError, KeyError) as exc:
+        log.error("❌ Catálogo de orígenes: %s", exc)
+        return 1
+    if not catalog.single:
+        log.info("✅ Catálogo OK (%s orígenes, modo %s).", len(catalog.sources), catalog.mode)
+    return 0
+
+
+# ───── Parser ───────────────────────────────────────────────────────────────
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="ETL incremental Sigrid → PostgreSQL")
+    parser.add_argument("-v", "--verbose", action="store_true", help="logging DEBUG")
+    sub = parser.add_subparsers(dest="command")
+
+    p_run = sub.add_parser("run", help="ejecuta el ETL una vez")
+    p_run.add_argument("tables", nargs="*",
+                       help="claves, target_table o patrones glob (por defecto TABLES)")
+    p_run.add_argument("--chunk", type=int, help="PKs por lote (Config.ETL_CHUNK)")
+    p_run.add_argument("--parallel", type=int, default=1, help="tablas en paralelo")
+    p_run.add_argument("--dry-run", action="store_true",
+                       help="calcula el diff pero no carga nada")
+    p_run.add_argument("--sink", action="append", choices=("postgres", "asyncpg", "parquet"),
+                       help="destino(s); repetir para varios (por defecto postgres; "
+                            "asyncpg = PostgreSQL con COPY asíncrono en vuelo)")
+    p_run.add_argument("--cache", action=argparse.BooleanOptionalAction, default=None,
+                       help="caché local de chunks extraídos (Config.ETL_CACHE)")
+    p_run.add_argument("--transform-workers", type=int, metavar="N",
+                       help="procesos para las transformaciones (Config.ETL_TRANSFORM_WORKERS; "
+                            "0/1 = en el proceso principal)")
+    p_run.add_argument("--profile", action="store_true",
+                       help="perfil CPU (muestreo) + tracemalloc por tabla y etapa; "
+                            "informes en Config.ETL_PROFILE_DIR")
+    p_run.set_defaults(func=cmd_run)
+
+    p_plan = sub.add_parser("plan", help="estima volumen y tiempo sin cargar nada")
+    p_plan.add_argument("tables", nargs="*",
+                        help="claves, target_table o patrones glob (por defecto TABLES)")
+    p_plan.add_argument("--quick", action="store_true",
+                        help="solo COUNT(*) origen/destino, sin diff de hashes")
+    p_plan.add_argument("--fail-above", type=int, metavar="N",
+                        help="sale con código 2 si alguna tabla movería más de N filas")
+    p_plan.set_defaults(func=cmd_plan)
+
+    p_daemon = sub.add_parser("daemon", help="modo servicio con planificación por tabla")
+    p_daemon.add_argument("tables", nargs="*", help="por defecto todas")
+    p_daemon.add_argument("--chunk", type=int, help="PKs por lote (Config.ETL_CHUNK)")
+    p_daemon.add_argument("--run-now", action="store_true",
+                          help="lanza todas las tablas al arrancar")
+    p_daemon.add_argument("--transform-workers", type=int, metavar="N",
+                          help="procesos para las transformaciones (Config.ETL_TRANSFORM_WORKERS)")
+    p_daemon.set_defaults(func=cmd_daemon)
+
+    p_trigger = sub.add_parser("trigger", help="pide al servicio ejecutar tablas ya")
+    p_trigger.add_argument("tables", nargs="+")
+    p_trigger.set_defaults(func=cmd_trigger)
+
+    p_check = sub.add_parser("check", help="prueba conexiones SQL Server y PostgreSQL")
+    p_check.set_defaults(func=cmd_check)
+
+    p_compact = sub.add_parser("compact", help="compacta los deltas Parquet en la base")
+    p_compact.add_argument("tables", nargs="*",
+                           help="claves, target_table o patrones glob (por defecto TABLES)")
+    p_compact.set_defaults(func=cmd_compact)
+
+    p_validate = sub.add_parser("validate", help="valida TABLE_CONFIG sin conectar")
+    p_validate.set_defaults(func=cmd_validate)
+
+    # catálogo de orígenes (varias bases Sigrid, ver infrastructure/source_catalog.py)
+    for p in (p_run, p_plan, p_daemon, p_compact):
+        p.add_argument("--source", action="append", metavar="NOMBRE",
+                       help="solo estos orígenes del catálogo (repetible)")
+    for p in (p_run, p_daemon):
+        p.add_argument("--sources-parallel", type=int, metavar="N",
+                       help="orígenes a la vez (Config.ETL_SOURCES_PARALLEL)")
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:                 # compatibilidad: `python main.py`
+        args = parser.parse_args((["-v"] if args.verbose else []) + ["run"])
+
+    # ───── logging ──────────────────────────────────────────────────────────
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s  [%(levelname)s]  %(name)s: %(message)s",
+    )
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
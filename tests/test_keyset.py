@@ -0,0 +1,51 @@
+# tests/test_keyset.py
+import numpy as np
+import pytest
+
+from application.keyset import KeySet
+
+
+def _random_keys(rng):
+    """Mezcla de rangos largos (altas en bloque) y claves sueltas."""
+    blocks = [np.arange(a, a + rng.integers(1, 200)) for a in rng.integers(0, 5_000, 5)]
+    return np.concatenate(blocks + [rng.integers(0, 5_000, rng.integers(0, 80))])
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_set_operations_match_numpy(seed):
+    rng = np.random.default_rng(seed)
+    a, b = _random_keys(rng), _random_keys(rng)
+    A, B = KeySet(a), KeySet(b)
+    assert np.array_equal(A.union(B).array, np.union1d(a, b))
+    assert np.array_equal(A.intersection(B).array, np.intersect1d(a, b))
+    assert np.array_equal(A.difference(B).array, np.setdiff1d(a, b))
+    assert np.array_equal(B.difference(A).array, np.setdiff1d(b, a))
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_bytes_round_trip(seed):
+    ks = KeySet(_random_keys(np.random.default_rng(seed)))
+    assert KeySet.from_bytes(ks.to_bytes()) == ks
+
+
+def test_empty_and_dense_sets():
+    empty = KeySet()
+    dense = KeySet(np.arange(1, 1_000_001))
+    assert KeySet.from_bytes(empty.to_bytes()) == empty
+    assert KeySet.from_bytes(dense.to_bytes()) == dense
+    assert dense.nbytes == 16                       # un solo rango
+    assert len(dense.difference(KeySet([10, 20]))) == 999_998
+    assert dense.intersection(empty) == empty
+    assert dense.difference(empty) == dense
+
+
+def test_chunks_split_ranges():
+    ks = KeySet(np.concatenate([np.arange(0, 100), np.arange(500, 560)]))
+    parts = list(ks.chunks(30))
+    assert all(len(p) <= 30 for p in parts)
+    assert np.array_equal(np.concatenate([p.array for p in parts]), ks.array)
+
+
+def test_from_bytes_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        KeySet.from_bytes(b"xx")